@@ -21,18 +21,32 @@ import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
-from collections import deque, defaultdict
+from collections import deque, defaultdict, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from bisect import bisect_left, bisect_right, insort
+from functools import lru_cache
+import os
+import sys
+import copy
+import shutil
+import hashlib
 import time
 import json
 from io import BytesIO
 from scipy import stats
+from scipy.signal import lfilter, fftconvolve
 from sklearn.ensemble import IsolationForest, RandomForestRegressor
 from sklearn.preprocessing import StandardScaler, RobustScaler
 from sklearn.cluster import KMeans
 from sklearn.mixture import GaussianMixture
 from sklearn.covariance import EllipticEnvelope
 from sklearn.svm import OneClassSVM
-from sklearn.neighbors import LocalOutlierFactor
+from sklearn.linear_model import SGDOneClassSVM
+from sklearn.kernel_approximation import RBFSampler
+from sklearn.decomposition import IncrementalPCA
+from sklearn.neighbors import KDTree, BallTree
+import joblib
 import warnings
 warnings.filterwarnings("ignore")
 
@@ -1108,50 +1122,821 @@ st.markdown("""
 # ANOMALY DETECTION CLASSES
 # ============================================================================
 
+class RollingMoments:
+    """Running mean and variance of a sliding window (Welford add/remove)"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self, data=None):
+        """Clear the moments, or rebuild them exactly from a window of data"""
+        if data is None or len(data) == 0:
+            self.count = 0
+            self.mean = 0.0
+            self.m2 = 0.0
+        else:
+            data = np.asarray(data, dtype=float)
+            self.count = len(data)
+            self.mean = float(np.mean(data))
+            self.m2 = float(np.sum((data - self.mean) ** 2))
+
+    def add(self, value):
+        """Grow the window by one value"""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def replace(self, old_value, new_value):
+        """Slide a full window: evict old_value and add new_value in one step"""
+        delta = new_value - old_value
+        old_mean = self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (new_value - self.mean + old_value - old_mean)
+
+    def std(self):
+        """Population standard deviation (matches np.std)"""
+        if self.count == 0:
+            return 0.0
+        return np.sqrt(max(self.m2, 0.0) / self.count)
+
+
+def _interpolated_quantile(ordered, n, q):
+    """np.percentile(..., q) of sorted data of length n
+
+    ordered is an array of sorted rows (one result per row), or a callable
+    returning the k-th smallest value, such as SortedWindow.__getitem__.
+    """
+    kth = ordered if callable(ordered) else (lambda k: ordered[:, k])
+    virtual = (n - 1) * (q / 100)
+    if virtual >= n - 1:
+        return kth(n - 1)
+    prev = int(np.floor(virtual))
+    gamma = virtual - prev
+    a = kth(prev)
+    b = kth(prev + 1)
+    diff = b - a
+    if gamma >= 0.5:
+        return b - diff * (1 - gamma)
+    return a + diff * gamma
+
+
+class SortedWindow:
+    """Sorted multiset of the values in a sliding window
+
+    Values are kept in a list of sorted blocks (the sortedcontainers layout)
+    with a Fenwick tree over block lengths, so insert, evict and positional
+    lookups are O(log w). Quantiles reproduce np.percentile/np.median exactly.
+    """
+
+    def __init__(self, load=64):
+        self.load = load
+        self.clear()
+
+    def clear(self):
+        self._blocks = []
+        self._maxes = []
+        self._tree = [0]
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def _rebuild_index(self):
+        """Rebuild the Fenwick tree after blocks were split or merged"""
+        n = len(self._blocks)
+        tree = [0] * (n + 1)
+        for i, block in enumerate(self._blocks, 1):
+            tree[i] += len(block)
+            parent = i + (i & -i)
+            if parent <= n:
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _update_index(self, block_pos, delta):
+        tree = self._tree
+        i = block_pos + 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def add(self, value):
+        """Insert a value"""
+        if not self._blocks:
+            self._blocks.append([value])
+            self._maxes.append(value)
+            self._len = 1
+            self._rebuild_index()
+            return
+
+        pos = bisect_right(self._maxes, value)
+        if pos == len(self._maxes):
+            pos -= 1
+            self._blocks[pos].append(value)
+            self._maxes[pos] = value
+        else:
+            insort(self._blocks[pos], value)
+        self._len += 1
+
+        block = self._blocks[pos]
+        if len(block) > 2 * self.load:
+            tail = block[self.load:]
+            del block[self.load:]
+            self._maxes[pos] = block[-1]
+            self._blocks.insert(pos + 1, tail)
+            self._maxes.insert(pos + 1, tail[-1])
+            self._rebuild_index()
+        else:
+            self._update_index(pos, 1)
+
+    def remove(self, value):
+        """Remove one occurrence of a value"""
+        pos = bisect_left(self._maxes, value)
+        if pos == len(self._maxes):
+            raise ValueError(f"{value!r} not in window")
+        block = self._blocks[pos]
+        idx = bisect_left(block, value)
+        if block[idx] != value:
+            raise ValueError(f"{value!r} not in window")
+        del block[idx]
+        self._len -= 1
+
+        if not block:
+            del self._blocks[pos]
+            del self._maxes[pos]
+            self._rebuild_index()
+        elif len(block) < self.load // 2 and len(self._blocks) > 1:
+            # Merge undersized blocks into a neighbour so lookups stay shallow
+            left = pos - 1 if pos > 0 else pos
+            merged = self._blocks[left] + self._blocks[left + 1]
+            self._blocks[left:left + 2] = [merged]
+            self._maxes[left:left + 2] = [merged[-1]]
+            self._rebuild_index()
+            if len(merged) > 2 * self.load:
+                tail = merged[self.load:]
+                del merged[self.load:]
+                self._maxes[left] = merged[-1]
+                self._blocks.insert(left + 1, tail)
+                self._maxes.insert(left + 1, tail[-1])
+                self._rebuild_index()
+        else:
+            self._maxes[pos] = block[-1]
+            self._update_index(pos, -1)
+
+    def __getitem__(self, k):
+        """k-th smallest value (0-based, negative indices allowed)"""
+        if k < 0:
+            k += self._len
+        if not 0 <= k < self._len:
+            raise IndexError("window index out of range")
+        tree = self._tree
+        n = len(tree) - 1
+        pos = 0
+        step = 1 << (n.bit_length() - 1)
+        while step:
+            nxt = pos + step
+            if nxt <= n and tree[nxt] <= k:
+                pos = nxt
+                k -= tree[nxt]
+            step >>= 1
+        return self._blocks[pos][k]
+
+    def bisect_left(self, value):
+        """Number of values strictly below value"""
+        pos = bisect_left(self._maxes, value)
+        if pos == len(self._maxes):
+            return self._len
+        count = bisect_left(self._blocks[pos], value)
+        i = pos
+        while i > 0:
+            count += self._tree[i]
+            i -= i & -i
+        return count
+
+    def min(self):
+        return self[0]
+
+    def max(self):
+        return self[-1]
+
+    def percentile(self, q):
+        """Linear-interpolated percentile, identical to np.percentile"""
+        return _interpolated_quantile(self.__getitem__, self._len, q)
+
+    def median(self):
+        """Window median, identical to np.median"""
+        mid = self._len // 2
+        if self._len % 2:
+            return self[mid]
+        return (self[mid - 1] + self[mid]) / 2
+
+    def mad(self, center):
+        """Median of |x - center|, identical to np.median(np.abs(x - center))
+
+        The distances below and above center form two sorted sequences, so
+        their order statistics are found by a two-array selection without
+        materialising the distances.
+        """
+        split = self.bisect_left(center)
+        n_below = split
+        n_above = self._len - split
+
+        def below(i):
+            return center - self[split - 1 - i]
+
+        def above(i):
+            return self[split + i] - center
+
+        def kth(k):
+            lo = max(0, k + 1 - n_above)
+            hi = min(k + 1, n_below)
+            while lo < hi:
+                i = (lo + hi) // 2
+                if below(i) < above(k - i):
+                    lo = i + 1
+                else:
+                    hi = i
+            j = k + 1 - lo
+            candidates = []
+            if lo > 0:
+                candidates.append(below(lo - 1))
+            if j > 0:
+                candidates.append(above(j - 1))
+            return max(candidates)
+
+        mid = self._len // 2
+        if self._len % 2:
+            return kth(mid)
+        return (kth(mid - 1) + kth(mid)) / 2
+
+
+class KLLSketch:
+    """Mergeable KLL quantile sketch (Karnin, Lang & Liberty)
+
+    Items are kept in levels of compactors; an item at level h stands for
+    2**h inputs. Level capacities shrink geometrically by 2/3 below the top
+    level, so the sketch holds under 3k floats, and the normalized rank error
+    of any quantile is O(1/k) with high probability. At k=64 it averages about
+    1.3% per quantile; the worst of many quantiles reaches 3-5%.
+    """
+
+    def __init__(self, k=64, seed=None):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._buffer = np.empty(k)
+        self._fill = 0
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def update(self, value):
+        """Add one value"""
+        self._buffer[self._fill] = value
+        self._fill += 1
+        self.n += 1
+        if self._fill + len(self.levels[0]) >= self._capacity(0):
+            self._flush()
+            self._compress()
+
+    def _flush(self):
+        """Move staged values from the level-0 buffer into the levels"""
+        if self._fill:
+            self.levels[0] = np.concatenate([self.levels[0], self._buffer[:self._fill]])
+            self._fill = 0
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) >= self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # Odd leftovers stay behind; every other item moves up with
+                # twice the weight, starting at a random offset
+                leftover = len(items) % 2
+                offset = self._rng.integers(2)
+                promoted = items[offset:len(items) - leftover:2]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                self.levels[level] = items[len(items) - leftover:]
+            level += 1
+
+    def merge(self, other):
+        """Fold another sketch into this one"""
+        self._flush()
+        other._flush()
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+
+    def copy(self):
+        clone = KLLSketch(self.k)
+        self._flush()
+        clone.n = self.n
+        clone.levels = [items.copy() for items in self.levels]
+        clone._rng = np.random.default_rng(self._rng.integers(2 ** 32))
+        return clone
+
+    def weighted_items(self):
+        """(values, weights) of everything the sketch currently retains"""
+        values = np.concatenate(self.levels + [self._buffer[:self._fill]])
+        weights = np.concatenate([np.full(len(items), 2.0 ** level)
+                                  for level, items in enumerate(self.levels)] +
+                                 [np.ones(self._fill)])
+        return values, weights
+
+    def nbytes(self):
+        return self._buffer.nbytes + sum(items.nbytes for items in self.levels)
+
+    def get_state(self):
+        """Retained items as plain arrays (staged values are flushed first)"""
+        self._flush()
+        return {
+            'meta': {'n': self.n, 'rng': self._rng.bit_generator.state},
+            'arrays': {
+                'items': np.concatenate(self.levels),
+                'level_sizes': np.array([len(items) for items in self.levels], dtype=np.int64)
+            }
+        }
+
+    def set_state(self, state):
+        arrays = state['arrays']
+        bounds = np.cumsum(arrays['level_sizes'])[:-1]
+        self.levels = np.split(np.array(arrays['items'], dtype=float), bounds)
+        self._fill = 0
+        self.n = state['meta']['n']
+        self._rng.bit_generator.state = state['meta']['rng']
+
+
+def _weighted_quantile(values, cum_weights, q):
+    """Inverted-CDF quantile of sorted values with cumulative weights"""
+    target = q * cum_weights[-1]
+    idx = min(np.searchsorted(cum_weights, target, side='left'), len(values) - 1)
+    return values[idx]
+
+
+class SketchWindow:
+    """Approximate sliding window backed by KLL sketches
+
+    The window is split into n_blocks blocks. Each block keeps a sketch plus
+    exact count/mean/M2/min/max, and whole blocks expire as the window slides,
+    so memory is O(n_blocks * k) however long the window is. The window slides
+    in steps of window_size // n_blocks and covers at most window_size values.
+    Quantile queries are KLL-approximate; mean and std are exact.
+    """
+
+    def __init__(self, window_size, k=64, n_blocks=4, seed=None):
+        self.window_size = window_size
+        self.k = k
+        self.n_blocks = n_blocks
+        self.block_size = max(1, window_size // n_blocks)
+        self._rng = np.random.default_rng(seed)
+        self.sealed = deque(maxlen=max(n_blocks - 1, 0))
+        self._sealed_summary = None
+        self._summary = None
+        self._new_block()
+
+    def _new_block(self):
+        self.current = {
+            'sketch': KLLSketch(self.k, seed=self._rng.integers(2 ** 32)),
+            'moments': RollingMoments(),
+            'min': np.inf,
+            'max': -np.inf
+        }
+
+    def add(self, value):
+        block = self.current
+        block['sketch'].update(value)
+        block['moments'].add(value)
+        block['min'] = min(block['min'], value)
+        block['max'] = max(block['max'], value)
+        if block['moments'].count >= self.block_size:
+            self.sealed.append(block)
+            self._sealed_summary = None
+            self._new_block()
+        self._summary = None
+
+    def _blocks(self):
+        return list(self.sealed) + [self.current]
+
+    def __len__(self):
+        return sum(block['moments'].count for block in self._blocks())
+
+    def mean(self):
+        return self._combined_moments()[1]
+
+    def std(self):
+        count, _, m2 = self._combined_moments()
+        return np.sqrt(max(m2, 0.0) / count) if count else 0.0
+
+    def _combined_moments(self):
+        """Chan et al. parallel combination of the per-block moments"""
+        count, mean, m2 = 0, 0.0, 0.0
+        for block in self._blocks():
+            moments = block['moments']
+            if moments.count == 0:
+                continue
+            total = count + moments.count
+            delta = moments.mean - mean
+            mean += delta * moments.count / total
+            m2 += moments.m2 + delta ** 2 * count * moments.count / total
+            count = total
+        return count, mean, m2
+
+    def min(self):
+        return min(block['min'] for block in self._blocks())
+
+    def max(self):
+        return max(block['max'] for block in self._blocks())
+
+    def _sorted_items(self):
+        """Sorted retained values and cumulative weights for the whole window
+
+        The sealed blocks are merged and sorted once when a block seals; per
+        query only the current block is sorted, and the two sorted runs are
+        merged by a stable (run-aware) sort.
+        """
+        if self._summary is None:
+            if self._sealed_summary is None:
+                parts = [block['sketch'].weighted_items() for block in self.sealed]
+                values = np.concatenate([p[0] for p in parts]) if parts else np.empty(0)
+                weights = np.concatenate([p[1] for p in parts]) if parts else np.empty(0)
+                order = np.argsort(values)
+                self._sealed_summary = (values[order], weights[order])
+            values, weights = self.current['sketch'].weighted_items()
+            order = np.argsort(values)
+            values = np.concatenate([self._sealed_summary[0], values[order]])
+            weights = np.concatenate([self._sealed_summary[1], weights[order]])
+            order = np.argsort(values, kind='stable')
+            self._summary = (values[order], weights[order], np.cumsum(weights[order]))
+        return self._summary
+
+    def percentile(self, q):
+        values, _, cum_weights = self._sorted_items()
+        return _weighted_quantile(values, cum_weights, q / 100)
+
+    def median(self):
+        return self.percentile(50)
+
+    def mad(self, center):
+        """Weighted median of |x - center| over the retained items"""
+        values, weights, _ = self._sorted_items()
+        split = np.searchsorted(values, center)
+        # Distances below and above center are two sorted runs
+        deviations = np.concatenate([center - values[:split][::-1], values[split:] - center])
+        weights = np.concatenate([weights[:split][::-1], weights[split:]])
+        order = np.argsort(deviations, kind='stable')
+        return _weighted_quantile(deviations[order], np.cumsum(weights[order]), 0.5)
+
+    def nbytes(self):
+        return sum(block['sketch'].nbytes() for block in self._blocks())
+
+    def get_state(self):
+        """Blocks as plain arrays: sketch items, level sizes and exact stats"""
+        blocks = self._blocks()
+        sketches = [block['sketch'].get_state() for block in blocks]
+        return {
+            'meta': {'n_sealed': len(self.sealed), 'rng': self._rng.bit_generator.state,
+                     'sketches': [sketch['meta'] for sketch in sketches]},
+            'arrays': {
+                'items': np.concatenate([sketch['arrays']['items'] for sketch in sketches]),
+                'level_sizes': np.concatenate([sketch['arrays']['level_sizes'] for sketch in sketches]),
+                'n_levels': np.array([len(sketch['arrays']['level_sizes']) for sketch in sketches]),
+                'stats': np.array([[block['moments'].count, block['moments'].mean, block['moments'].m2,
+                                    block['min'], block['max']] for block in blocks])
+            }
+        }
+
+    def set_state(self, state):
+        meta = state['meta']
+        arrays = state['arrays']
+        level_sizes = np.asarray(arrays['level_sizes'])
+        blocks = []
+        item_start = level_start = 0
+        for sketch_meta, n_levels, (count, mean, m2, low, high) in zip(
+                meta['sketches'], arrays['n_levels'], np.asarray(arrays['stats'])):
+            sizes = level_sizes[level_start:level_start + n_levels]
+            n_items = int(sizes.sum())
+            sketch = KLLSketch(self.k)
+            sketch.set_state({'meta': sketch_meta, 'arrays': {
+                'items': arrays['items'][item_start:item_start + n_items], 'level_sizes': sizes
+            }})
+            moments = RollingMoments()
+            moments.count, moments.mean, moments.m2 = int(count), float(mean), float(m2)
+            blocks.append({'sketch': sketch, 'moments': moments, 'min': float(low), 'max': float(high)})
+            item_start += n_items
+            level_start += n_levels
+        self.sealed.clear()
+        self.sealed.extend(blocks[:meta['n_sealed']])
+        self.current = blocks[-1]
+        self._rng.bit_generator.state = meta['rng']
+        self._sealed_summary = None
+        self._summary = None
+
+
+# Grubbs critical values keyed by (window_size, alpha), shared by all detectors
+_GRUBBS_CRITICAL_TABLES = {}
+
+
+def grubbs_critical_values(window_size, alpha=0.05):
+    """Two-sided Grubbs critical values for every window length up to window_size
+
+    Entry n is the critical value for a window of n points (0 where n <= 2).
+    The table is built with a single vectorized t.ppf call the first time a
+    (window_size, alpha) pair is requested and reused afterwards.
+    """
+    key = (int(window_size), float(alpha))
+    table = _GRUBBS_CRITICAL_TABLES.get(key)
+    if table is None:
+        n = np.arange(3, window_size + 1, dtype=float)
+        t_crit = stats.t.ppf(1 - alpha/(2*n), n-2)
+        table = np.zeros(window_size + 1)
+        table[3:] = ((n-1) / np.sqrt(n)) * np.sqrt(t_crit**2 / (n - 2 + t_crit**2))
+        table.setflags(write=False)
+        _GRUBBS_CRITICAL_TABLES[key] = table
+    return table
+
+
+_ESD_CRITICAL_TABLES = {}
+
+
+def esd_critical_values(window_size, max_outliers, alpha=0.05):
+    """Rosner's generalized ESD critical values lambda_i for every window length
+
+    Row n holds lambda_1..lambda_max_outliers for a window of n points; steps
+    that would leave fewer than three points are inf (never significant).
+    Built with one vectorized t.ppf call and cached like the Grubbs table.
+    """
+    key = (int(window_size), int(max_outliers), float(alpha))
+    table = _ESD_CRITICAL_TABLES.get(key)
+    if table is None:
+        n = np.arange(window_size + 1, dtype=float)[:, None]
+        i = np.arange(1, max_outliers + 1, dtype=float)[None, :]
+        dof = n - i - 1
+        valid = dof >= 1
+        safe_dof = np.where(valid, dof, 1.0)
+        t_crit = stats.t.ppf(1 - alpha / (2 * np.where(valid, n - i + 1, 1.0)), safe_dof)
+        lam = (n - i) * t_crit / np.sqrt((safe_dof + t_crit**2) * (n - i + 1))
+        table = np.where(valid, lam, np.inf)
+        table.setflags(write=False)
+        _ESD_CRITICAL_TABLES[key] = table
+    return table
+
+
+def score_window_rows(ordered, mean, std, current, z_threshold, iqr_multiplier, grubbs_crit,
+                      grubbs_anomaly=None):
+    """StatisticalAnomalyDetector.detect for many windows at once
+
+    Row i of ordered is a sorted window ending at current[i], with population
+    mean/std. grubbs_anomaly overrides the Grubbs check (generalized ESD).
+    Returns (is_anomaly, scores, details) arrays aligned with the rows.
+    """
+    n = ordered.shape[1]
+    z_score = (current - mean) / (std + 1e-8)
+
+    q1 = _interpolated_quantile(ordered, n, 25)
+    q3 = _interpolated_quantile(ordered, n, 75)
+    iqr = q3 - q1
+    lower_bound = q1 - iqr_multiplier * iqr
+    upper_bound = q3 + iqr_multiplier * iqr
+    iqr_anomaly = (current < lower_bound) | (current > upper_bound)
+
+    mid = n // 2
+    median = ordered[:, mid] if n % 2 else (ordered[:, mid - 1] + ordered[:, mid]) / 2
+    deviations = np.abs(ordered - median[:, None])
+    deviations.sort(axis=1)
+    mad = deviations[:, mid] if n % 2 else (deviations[:, mid - 1] + deviations[:, mid]) / 2
+    modified_z = 0.6745 * (current - median) / (mad + 1e-8)
+
+    spread = np.maximum(mean - ordered[:, 0], ordered[:, -1] - mean)
+    grubbs_stat = np.where(std > 0, spread / np.where(std > 0, std, 1.0), 0.0)
+    if grubbs_anomaly is None:
+        grubbs_anomaly = grubbs_stat > grubbs_crit
+
+    anomaly_score = (
+        0.3 * (np.abs(z_score) / z_threshold) +
+        0.3 * iqr_anomaly +
+        0.2 * (np.abs(modified_z) / z_threshold) +
+        0.2 * grubbs_anomaly
+    )
+
+    details = {
+        'z_score': z_score,
+        'modified_z': modified_z,
+        'iqr_bounds': np.column_stack([lower_bound, upper_bound]),
+        'grubbs_stat': grubbs_stat,
+        'methods_triggered': (
+            (np.abs(z_score) > z_threshold).astype(int) + iqr_anomaly +
+            (np.abs(modified_z) > z_threshold) + grubbs_anomaly
+        )
+    }
+    return anomaly_score > 0.5, np.minimum(anomaly_score, 1.0), details
+
+
 class StatisticalAnomalyDetector:
     """Statistical methods for anomaly detection"""
     
-    def __init__(self, window_size=100, z_threshold=3.0, iqr_multiplier=1.5):
+    def __init__(self, window_size=100, z_threshold=3.0, iqr_multiplier=1.5, alpha=0.05,
+                 quantile_mode='exact', sketch_k=64, sketch_blocks=4, esd_max_outliers=0):
         self.window_size = window_size
         self.z_threshold = z_threshold
         self.iqr_multiplier = iqr_multiplier
+        self.alpha = alpha
+        self.quantile_mode = quantile_mode
+        self.sketch_k = sketch_k
+        self.sketch_blocks = sketch_blocks
+        self.grubbs_table = grubbs_critical_values(window_size, alpha)
         self.history = deque(maxlen=window_size)
-        
+        self.moments = RollingMoments()
+        self.sorted_window = SortedWindow()
+        # NaN/inf have no place in a sorted order, so they stay out of the
+        # sorted window and moments; while any is in the window, points score
+        # NaN (as np.percentile/np.mean over the raw window would)
+        self._nonfinite = 0
+        self._slides_since_resync = 0
+        # 'sketch' mode replaces the exact buffer with a few KB of KLL
+        # sketches, for windows too long to hold per series. It saves
+        # memory, not time: per point it is slower than exact mode
+        self.sketch_window = None
+        if quantile_mode == 'sketch':
+            self.sketch_window = SketchWindow(window_size, k=sketch_k, n_blocks=sketch_blocks, seed=42)
+        elif quantile_mode != 'exact':
+            raise ValueError(f"Unknown quantile_mode: {quantile_mode!r}")
+        # Generalized ESD (up to esd_max_outliers per window) replaces the
+        # single-outlier Grubbs check; it walks the exact sorted window
+        self.esd_max_outliers = esd_max_outliers
+        self.esd_table = None
+        if esd_max_outliers:
+            if self.sketch_window is not None:
+                raise ValueError("Generalized ESD needs quantile_mode='exact'")
+            self.esd_table = esd_critical_values(window_size, esd_max_outliers, alpha)
+
+    def _push(self, value):
+        """Append value to the window and update the rolling state"""
+        finite = np.isfinite(value)
+        if len(self.history) == self.window_size:
+            evicted = self.history[0]
+            self.history.append(value)
+            if np.isfinite(evicted):
+                self.sorted_window.remove(evicted)
+            else:
+                self._nonfinite -= 1
+            if finite:
+                self.sorted_window.add(value)
+            else:
+                self._nonfinite += 1
+            if self._nonfinite:
+                return
+            if not np.isfinite(evicted):
+                # Last non-finite value just left: moments restart from the window
+                self.moments.reset(self.history)
+                self._slides_since_resync = 0
+                return
+            self.moments.replace(evicted, value)
+            # Rebuild from the window once per full rotation so rounding
+            # error cannot accumulate over long streams (amortised O(1))
+            self._slides_since_resync += 1
+            if self._slides_since_resync >= self.window_size:
+                self.moments.reset(self.history)
+                self._slides_since_resync = 0
+        else:
+            self.history.append(value)
+            if finite:
+                self.sorted_window.add(value)
+            else:
+                self._nonfinite += 1
+            if not self._nonfinite:
+                self.moments.add(value)
+
+    def _rebuild(self):
+        """Rebuild the sorted window and moments from history"""
+        self.sorted_window.clear()
+        self._nonfinite = 0
+        for value in self.history:
+            if np.isfinite(value):
+                self.sorted_window.add(value)
+            else:
+                self._nonfinite += 1
+        self.moments.reset(self.history if not self._nonfinite else None)
+        self._slides_since_resync = 0
+
+    def get_state(self):
+        """Checkpoint state: the raw window (or the sketch window as arrays)"""
+        state = {
+            'params': {
+                'window_size': self.window_size, 'z_threshold': self.z_threshold,
+                'iqr_multiplier': self.iqr_multiplier, 'alpha': self.alpha,
+                'quantile_mode': self.quantile_mode, 'sketch_k': self.sketch_k,
+                'sketch_blocks': self.sketch_blocks, 'esd_max_outliers': self.esd_max_outliers
+            },
+            'meta': {},
+            'arrays': {'history': np.fromiter(self.history, dtype=float, count=len(self.history))}
+        }
+        if self.sketch_window is not None:
+            sketch_state = self.sketch_window.get_state()
+            state['meta']['sketch'] = sketch_state['meta']
+            state['arrays'].update({f'sketch_{key}': array for key, array in sketch_state['arrays'].items()})
+        return state
+
+    def set_state(self, state):
+        """Restore from get_state(); sorted window and moments are rebuilt"""
+        self.history.clear()
+        self.history.extend(np.asarray(state['arrays']['history']).tolist())
+        self._rebuild()
+        if 'sketch' in state.get('meta', {}):
+            self.sketch_window.set_state({'meta': state['meta']['sketch'], 'arrays': {
+                key[len('sketch_'):]: array for key, array in state['arrays'].items() if key.startswith('sketch_')
+            }})
+
+    def _generalized_esd(self, value):
+        """Rosner's generalized ESD on the current window
+
+        Candidates are always the two ends of the sorted window, so each of
+        the k steps is two sorted-window lookups and a Welford removal from
+        the running moments instead of a full pass over the window. Returns
+        (number of outliers, whether value is one of them).
+        """
+        window = self.sorted_window
+        n = len(window)
+        critical = self.esd_table[n]
+        mean = self.moments.mean
+        m2 = self.moments.m2
+        lo, hi = 0, n - 1
+        removed = []
+        n_outliers = 0
+        for i in range(min(self.esd_max_outliers, n - 2)):
+            remaining = n - i
+            std = np.sqrt(max(m2, 0.0) / (remaining - 1))
+            if std == 0:
+                break
+            low, high = window[lo], window[hi]
+            if mean - low > high - mean:
+                candidate = low
+                lo += 1
+            else:
+                candidate = high
+                hi -= 1
+            if abs(candidate - mean) / std > critical[i]:
+                n_outliers = i + 1
+            removed.append(candidate)
+            new_mean = mean - (candidate - mean) / (remaining - 1)
+            m2 -= (candidate - mean) * (candidate - new_mean)
+            mean = new_mean
+        return n_outliers, value in removed[:n_outliers]
+
     def detect(self, value):
         """Detect anomaly using multiple statistical methods"""
-        self.history.append(value)
+        if self.sketch_window is not None:
+            window = self.sketch_window
+            window.add(value)
+            n = len(window)
+            mean = window.mean()
+            std = window.std()
+        else:
+            self._push(value)
+            window = self.sorted_window
+            n = len(self.history)
+            mean = self.moments.mean
+            std = self.moments.std()
         
-        if len(self.history) < 10:
+        if n < 10:
             return False, 0.0, {}
-        
-        data = np.array(self.history)
+        if self._nonfinite:
+            return False, np.nan, {
+                'z_score': np.nan, 'modified_z': np.nan, 'iqr_bounds': (np.nan, np.nan),
+                'grubbs_stat': np.nan, 'methods_triggered': 0
+            }
         
         # Z-score method
-        mean = np.mean(data)
-        std = np.std(data)
         z_score = (value - mean) / (std + 1e-8)
         z_anomaly = abs(z_score) > self.z_threshold
         
         # IQR method
-        q1 = np.percentile(data, 25)
-        q3 = np.percentile(data, 75)
+        q1 = window.percentile(25)
+        q3 = window.percentile(75)
         iqr = q3 - q1
         lower_bound = q1 - self.iqr_multiplier * iqr
         upper_bound = q3 + self.iqr_multiplier * iqr
         iqr_anomaly = value < lower_bound or value > upper_bound
         
         # Modified Z-score (more robust)
-        median = np.median(data)
-        mad = np.median(np.abs(data - median))
+        median = window.median()
+        mad = window.mad(median)
         modified_z = 0.6745 * (value - median) / (mad + 1e-8)
         mad_anomaly = abs(modified_z) > self.z_threshold
         
         # Grubbs test for outliers
-        grubbs_stat = (max(abs(data - mean))) / std if std > 0 else 0
-        n = len(data)
-        t_crit = stats.t.ppf(1 - 0.05/(2*n), n-2) if n > 2 else 0
-        grubbs_crit = ((n-1) / np.sqrt(n)) * np.sqrt(t_crit**2 / (n - 2 + t_crit**2))
+        grubbs_stat = max(mean - window.min(), window.max() - mean) / std if std > 0 else 0
+        grubbs_crit = self.grubbs_table[n]
         grubbs_anomaly = grubbs_stat > grubbs_crit
+        if self.esd_table is not None:
+            esd_outliers, grubbs_anomaly = self._generalized_esd(value)
         
         # Combine methods
         anomaly_score = (
@@ -1170,15 +1955,994 @@ class StatisticalAnomalyDetector:
             'grubbs_stat': grubbs_stat,
             'methods_triggered': sum([z_anomaly, iqr_anomaly, mad_anomaly, grubbs_anomaly])
         }
+        if self.esd_table is not None:
+            details['esd_outliers'] = esd_outliers
         
         return is_anomaly, min(anomaly_score, 1.0), details
 
+    def detect_batch(self, values, chunk_elements=2 ** 22):
+        """Score a whole array at once; equivalent to calling detect per value
+
+        Returns (is_anomaly, scores, details) where details maps each method
+        to an array aligned with values ('iqr_bounds' has shape (n, 2)).
+        Windows that are not yet full are scored through the streaming path;
+        full windows are strided views scored in vectorized chunks. Sketch
+        mode has no value buffer to take views of, so it always streams.
+        """
+        values = np.asarray(values, dtype=float)
+        n_values = len(values)
+        w = self.window_size
+
+        is_anomaly = np.zeros(n_values, dtype=bool)
+        scores = np.zeros(n_values)
+        details = {
+            'z_score': np.full(n_values, np.nan),
+            'modified_z': np.full(n_values, np.nan),
+            'iqr_bounds': np.full((n_values, 2), np.nan),
+            'grubbs_stat': np.full(n_values, np.nan),
+            'methods_triggered': np.zeros(n_values, dtype=int)
+        }
+        if self.esd_table is not None:
+            details['esd_outliers'] = np.zeros(n_values, dtype=int)
+
+        # Warm-up: until the window is full, window length varies per point
+        n_warmup = min(n_values, w - len(self.history))
+        if w < 10 or self.sketch_window is not None:
+            n_warmup = n_values
+        for i in range(n_warmup):
+            flag, score, point_details = self.detect(values[i])
+            is_anomaly[i] = flag
+            scores[i] = score
+            for key, value in point_details.items():
+                details[key][i] = value
+        if n_warmup == n_values:
+            return is_anomaly, scores, details
+
+        # Every remaining point sees a full window of w values ending at it
+        buffer = np.concatenate([np.fromiter(self.history, dtype=float, count=len(self.history)),
+                                 values[n_warmup:]])
+        windows = np.lib.stride_tricks.sliding_window_view(buffer, w)[1:]
+        # Windows holding NaN/inf score NaN, as in the streaming path
+        nonfinite = np.concatenate([[0], np.cumsum(~np.isfinite(buffer))])
+        nonfinite = nonfinite[w + 1:] - nonfinite[1:-w]
+        grubbs_crit = self.grubbs_table[w]
+        rows_per_chunk = max(1, chunk_elements // w)
+
+        for start in range(0, len(windows), rows_per_chunk):
+            chunk = windows[start:start + rows_per_chunk]
+            current = chunk[:, -1]
+            out = slice(n_warmup + start, n_warmup + start + len(chunk))
+
+            mean = chunk.mean(axis=1)
+            std = chunk.std(axis=1)
+            # A full row sort is much cheaper than a multi-kth np.partition
+            ordered = np.sort(chunk, axis=1)
+            grubbs_anomaly = None
+            if self.esd_table is not None:
+                esd_outliers, grubbs_anomaly = self._generalized_esd_rows(ordered, mean, std, current)
+                details['esd_outliers'][out] = esd_outliers
+            flags, chunk_scores, chunk_details = score_window_rows(
+                ordered, mean, std, current, self.z_threshold, self.iqr_multiplier, grubbs_crit, grubbs_anomaly
+            )
+
+            is_anomaly[out] = flags
+            scores[out] = chunk_scores
+            for key, value in chunk_details.items():
+                details[key][out] = value
+            bad = np.flatnonzero(nonfinite[start:start + len(chunk)]) + out.start
+            if len(bad):
+                is_anomaly[bad] = False
+                scores[bad] = np.nan
+                for key in ('z_score', 'modified_z', 'iqr_bounds', 'grubbs_stat'):
+                    details[key][bad] = np.nan
+                details['methods_triggered'][bad] = 0
+                if self.esd_table is not None:
+                    details['esd_outliers'][bad] = 0
+
+        # Leave the rolling state exactly where the per-point loop would
+        self.history.extend(buffer[-w:].tolist())
+        self._rebuild()
+
+        return is_anomaly, scores, details
+
+    def _generalized_esd_rows(self, ordered, mean, std, current):
+        """Generalized ESD for a chunk of sorted full windows, one step per column"""
+        n_rows, w = ordered.shape
+        critical = self.esd_table[w]
+        rows = np.arange(n_rows)
+        lo = np.zeros(n_rows, dtype=int)
+        hi = np.full(n_rows, w - 1)
+        mean = mean.copy()
+        m2 = std ** 2 * w
+        steps = min(self.esd_max_outliers, w - 2)
+        removed = np.empty((n_rows, steps))
+        n_outliers = np.zeros(n_rows, dtype=int)
+        active = np.ones(n_rows, dtype=bool)
+        for i in range(steps):
+            remaining = w - i
+            sample_std = np.sqrt(np.maximum(m2, 0.0) / (remaining - 1))
+            active &= sample_std > 0
+            low = ordered[rows, lo]
+            high = ordered[rows, hi]
+            take_low = mean - low > high - mean
+            candidate = np.where(take_low, low, high)
+            lo += take_low
+            hi -= ~take_low
+            exceeds = np.abs(candidate - mean) > critical[i] * sample_std
+            n_outliers = np.where(active & exceeds, i + 1, n_outliers)
+            removed[:, i] = candidate
+            new_mean = mean - (candidate - mean) / (remaining - 1)
+            m2 -= (candidate - mean) * (candidate - new_mean)
+            mean = new_mean
+        flagged = (removed == current[:, None]) & (np.arange(steps) < n_outliers[:, None])
+        return n_outliers, flagged.any(axis=1)
+
+
+def compare_quantile_modes(values, window_size=100, sketch_k=64, sketch_blocks=4, check_every=50):
+    """Report the accuracy and speed of sketch mode against exact mode
+
+    Both modes stream the same values. Every check_every points the sketch's
+    quartiles and median are checked against the exact quantiles of the
+    values its window covers, as a normalized rank error (the KLL guarantee).
+    """
+    values = np.asarray(values, dtype=float)
+    exact = StatisticalAnomalyDetector(window_size=window_size)
+    sketch = StatisticalAnomalyDetector(window_size=window_size, quantile_mode='sketch',
+                                        sketch_k=sketch_k, sketch_blocks=sketch_blocks)
+
+    start = time.perf_counter()
+    exact_flags = np.array([exact.detect(v)[0] for v in values])
+    exact_time = time.perf_counter() - start
+
+    sketch_flags = np.zeros(len(values), dtype=bool)
+    sketch_time = 0.0
+    rank_errors = {25: [], 50: [], 75: []}
+    mad_errors = []
+    for i, v in enumerate(values):
+        start = time.perf_counter()
+        sketch_flags[i] = sketch.detect(v)[0]
+        sketch_time += time.perf_counter() - start
+
+        window = sketch.sketch_window
+        n = len(window)
+        if i % check_every or n < 10:
+            continue
+        covered = np.sort(values[i - n + 1:i + 1])
+        for q in rank_errors:
+            rank = np.searchsorted(covered, window.percentile(q), side='right') / n
+            rank_errors[q].append(abs(rank - q / 100))
+        exact_median = np.median(covered)
+        exact_mad = np.median(np.abs(covered - exact_median))
+        mad_errors.append(abs(window.mad(window.median()) - exact_mad) / (exact_mad + 1e-12))
+
+    n_points = max(len(values), 1)
+    return {
+        'window_size': window_size,
+        'exact_us_per_point': 1e6 * exact_time / n_points,
+        'sketch_us_per_point': 1e6 * sketch_time / n_points,
+        'exact_buffer_bytes': 2 * 8 * window_size,
+        'sketch_bytes': sketch.sketch_window.nbytes(),
+        'flag_agreement': float(np.mean(exact_flags == sketch_flags)) if len(values) else 1.0,
+        'max_rank_error': {f'q{q}': float(np.max(errs)) if errs else 0.0 for q, errs in rank_errors.items()},
+        'mean_mad_relative_error': float(np.mean(mad_errors)) if mad_errors else 0.0
+    }
+
+
+class EWMAAnomalyDetector:
+    """Exponentially weighted mean/variance z-score detector
+
+    Keeps three floats of state (mean, variance, count) instead of a window
+    buffer, so every update is O(1). Each point is scored against the state
+    before it is absorbed.
+    """
+
+    def __init__(self, halflife=50, z_threshold=3.0, min_periods=10):
+        self.halflife = halflife
+        self.z_threshold = z_threshold
+        self.min_periods = min_periods
+        self.alpha = 1.0 - np.exp(-np.log(2) / halflife)
+        self.mean = 0.0
+        self.var = 0.0
+        self.count = 0
+
+    def std(self):
+        return np.sqrt(self.var)
+
+    def _score(self, z_score):
+        return 0.5 * np.abs(z_score) / self.z_threshold
+
+    def detect(self, value):
+        """Score value against the current EWMA state, then absorb it"""
+        if self.count == 0:
+            self.mean = float(value)
+            self.count = 1
+            return False, 0.0, {}
+
+        mean = self.mean
+        std = np.sqrt(self.var)
+        diff = value - mean
+        z_score = diff / (std + 1e-8)
+        warm = self.count >= self.min_periods
+
+        # Same operations, in the same order, as the lfilter recursions in
+        # detect_batch, so both paths produce bit-identical state and scores
+        a = self.alpha
+        self.mean = a * value + (1 - a) * mean
+        self.var = (a * (1 - a)) * (diff * diff) + (1 - a) * self.var
+        self.count += 1
+
+        if not warm:
+            return False, 0.0, {}
+
+        anomaly_score = self._score(z_score)
+        details = {'z_score': z_score, 'ewma_mean': mean, 'ewma_std': std}
+        return anomaly_score > 0.5, min(anomaly_score, 1.0), details
+
+    def detect_batch(self, values):
+        """Vectorized equivalent of calling detect() on each value in turn
+
+        Both recursions are first-order linear filters once the pre-update
+        means are known, so they run through scipy.signal.lfilter:
+            mean_t = (1 - a) mean_{t-1} + a x_t
+            var_t  = (1 - a) var_{t-1} + a (1 - a) (x_t - mean_{t-1})^2
+        Returns (is_anomaly, scores, details) arrays, bit-identical to the
+        streaming path, and leaves the detector in the same state.
+        """
+        values = np.asarray(values, dtype=float)
+        n = len(values)
+        is_anomaly = np.zeros(n, dtype=bool)
+        scores = np.zeros(n)
+        details = {'z_score': np.zeros(n), 'ewma_mean': np.zeros(n), 'ewma_std': np.zeros(n)}
+        if n == 0:
+            return is_anomaly, scores, details
+
+        start = 0
+        if self.count == 0:
+            self.mean = float(values[0])
+            self.count = 1
+            start = 1
+        x = values[start:]
+        if len(x) == 0:
+            return is_anomaly, scores, details
+
+        a = self.alpha
+        denom = [1.0, -(1 - a)]
+        means = lfilter([a], denom, x, zi=[(1 - a) * self.mean])[0]
+        prev_means = np.concatenate(([self.mean], means[:-1]))
+        diff = x - prev_means
+        variances = lfilter([a * (1 - a)], denom, diff * diff, zi=[(1 - a) * self.var])[0]
+        prev_std = np.sqrt(np.concatenate(([self.var], variances[:-1])))
+
+        z_score = diff / (prev_std + 1e-8)
+        warm = (self.count + np.arange(len(x))) >= self.min_periods
+        raw = np.where(warm, self._score(z_score), 0.0)
+
+        out = slice(start, n)
+        is_anomaly[out] = raw > 0.5
+        scores[out] = np.minimum(raw, 1.0)
+        details['z_score'][out] = np.where(warm, z_score, 0.0)
+        details['ewma_mean'][out] = np.where(warm, prev_means, 0.0)
+        details['ewma_std'][out] = np.where(warm, prev_std, 0.0)
+
+        self.mean = float(means[-1])
+        self.var = float(variances[-1])
+        self.count += len(x)
+        return is_anomaly, scores, details
+
+    def get_state(self):
+        return {
+            'params': {'halflife': self.halflife, 'z_threshold': self.z_threshold,
+                       'min_periods': self.min_periods},
+            'meta': {'mean': self.mean, 'var': self.var, 'count': self.count}
+        }
+
+    def set_state(self, state):
+        meta = state['meta']
+        self.mean = meta['mean']
+        self.var = meta['var']
+        self.count = meta['count']
+
+
+def _lindley(start, increments):
+    """Vectorized g_t = max(0, g_{t-1} + inc_t) from g_0 = start"""
+    path = start + np.cumsum(increments)
+    return path - np.minimum(np.minimum.accumulate(path), 0.0)
+
+
+def _scan_with_resets(n, step, min_block=64, max_block=65536):
+    """Drive a resetting cumulative statistic over n points in blocks
+
+    step(start, stop) evaluates points [start, stop) from the current state
+    and returns how many it consumed: all of them, or up to and including
+    the first event that breaks the vectorized recursion (an alarm, after
+    which the detector has reset, or a clipped residual). Blocks double
+    while nothing happens, so quiet stretches cost a few vectorized passes
+    and each event costs at most one short block.
+    """
+    start = 0
+    block = min_block
+    while start < n:
+        stop = min(n, start + block)
+        consumed = step(start, stop)
+        block = min(2 * block, max_block) if consumed == stop - start else min_block
+        start += consumed
+
+
+class ResidualScaler:
+    """Robustly standardized residuals shared by the change-point detectors
+
+    The first min_periods values are a baseline: residuals from a trailing
+    median of halflife points give the starting scale as 1.4826 * MAD, so
+    spikes, shifts and variance bursts in the warm-up barely move it. Each
+    later value is scored as z = r / sigma against a clipped EWMA level,
+    which moves at most clip * sigma per point and restarts at the value
+    where the detector alarms. The variance is an EWMA of r**2 (half-life
+    scale_halflife) that skips clipped and alarmed points, so the anomalies
+    being detected never inflate the scale.
+    """
+
+    def __init__(self, halflife=10, clip=3.0, min_periods=100, scale_halflife=500):
+        self.halflife = halflife
+        self.clip = clip
+        self.min_periods = min_periods
+        self.scale_halflife = scale_halflife
+        self.window = max(1, int(round(halflife)))
+        if min_periods <= self.window + 1:
+            raise ValueError(f"min_periods must be larger than halflife + 1 ({self.window + 1})")
+        self.alpha = 1.0 - np.exp(-np.log(2) / halflife)
+        self.beta = 1.0 - np.exp(-np.log(2) / scale_halflife)
+        # Only |z| <= clip updates the scale; dividing by the normal variance
+        # truncated at clip keeps that from shrinking it
+        covered = 2 * stats.norm.cdf(clip) - 1
+        self.truncation = (covered - 2 * clip * stats.norm.pdf(clip)) / covered
+        self.baseline = []
+        self.level = None
+        self.var = None
+
+    def sigma(self):
+        return self.var ** 0.5 + 1e-8
+
+    def _fit_baseline(self):
+        values = np.asarray(self.baseline)
+        w = self.window
+        trailing = np.median(np.lib.stride_tricks.sliding_window_view(values[:-1], w), axis=1)
+        residuals = values[w:] - trailing
+        self.var = float((1.4826 * np.median(np.abs(residuals - np.median(residuals)))) ** 2)
+        self.level = float(np.median(values[-w:]))
+        self.baseline = []
+
+    def standardize(self, value):
+        """z-score of value against the current level and scale (None while warming up)"""
+        if self.level is None:
+            self.baseline.append(float(value))
+            if len(self.baseline) == self.min_periods:
+                self._fit_baseline()
+            return None
+        return (float(value) - self.level) / self.sigma()
+
+    def absorb(self, value, z_score, alarm):
+        """Fold a scored value into the level and scale"""
+        if alarm:
+            # Restart the level in the new regime; the scale is left alone
+            self.level = float(value)
+            return
+        bound = self.clip * self.sigma()
+        residual = float(value) - self.level
+        self.level += self.alpha * min(max(residual, -bound), bound)
+        if abs(z_score) <= self.clip:
+            self.var += self.beta * (residual * residual / self.truncation - self.var)
+
+    def standardize_block(self, values):
+        """Vectorized standardize/absorb over a run of values
+
+        Unclipped, unalarmed points make both recursions linear filters.
+        Returns (z, commit): z is exact up to and including the first point
+        with |z| > clip, and commit(k) absorbs the first k values, none of
+        which may be clipped or alarmed.
+        """
+        a, b = self.alpha, self.beta
+        levels = lfilter([a], [1.0, -(1 - a)], values, zi=[(1 - a) * self.level])[0]
+        residuals = values - np.concatenate(([self.level], levels[:-1]))
+        variances = lfilter([b / self.truncation], [1.0, -(1 - b)], residuals * residuals,
+                            zi=[(1 - b) * self.var])[0]
+        z = residuals / (np.sqrt(np.concatenate(([self.var], variances[:-1]))) + 1e-8)
+
+        def commit(k):
+            if k:
+                self.level = float(levels[k - 1])
+                self.var = float(variances[k - 1])
+
+        return z, commit
+
+    def get_state(self):
+        return {
+            'meta': {'level': self.level, 'var': self.var},
+            'arrays': {'baseline': np.asarray(self.baseline, dtype=float)}
+        }
+
+    def set_state(self, state):
+        self.level = state['meta']['level']
+        self.var = state['meta']['var']
+        self.baseline = np.asarray(state['arrays']['baseline'], dtype=float).tolist()
+
+
+def _detect_change_points(detector, values):
+    """detect_batch for CUSUMDetector and PageHinkleyDetector
+
+    Warm-up values go through detect(). After that each block is
+    standardized and passed through detector._statistics in one vectorized
+    pass up to its first event (a clipped residual or an alarm); the quiet
+    points before it are committed in bulk and the event point itself goes
+    through detect(), so the state evolves as in the streaming path. Short
+    blocks, which only follow events, are streamed outright.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    pos_key, neg_key = detector.DETAIL_KEYS
+    pos_out = np.zeros(n)
+    neg_out = np.zeros(n)
+    is_anomaly = np.zeros(n, dtype=bool)
+    scaler = detector.residuals
+
+    def stream(i):
+        is_anomaly[i], _, details = detector.detect(values[i])
+        pos_out[i] = details[pos_key]
+        neg_out[i] = details[neg_key]
+
+    def step(start, stop):
+        if scaler.level is None or stop - start <= 16:
+            # Warm-up and the short block after each event stream point by
+            # point, which is cheaper than a vectorized pass cut short again
+            for i in range(start, stop):
+                stream(i)
+            return stop - start
+        z, commit_residuals = scaler.standardize_block(values[start:stop])
+        clipped = np.flatnonzero(np.abs(z) > scaler.clip)
+        quiet = clipped[0] if clipped.size else len(z)
+        pos, neg, commit_statistics = detector._statistics(z[:quiet])
+        alarms = np.flatnonzero((pos > detector.threshold) | (neg > detector.threshold))
+        if alarms.size:
+            quiet = alarms[0]
+        commit_residuals(quiet)
+        commit_statistics(quiet)
+        pos_out[start:start + quiet] = pos[:quiet]
+        neg_out[start:start + quiet] = neg[:quiet]
+        if quiet == len(z):
+            return quiet
+        stream(start + quiet)
+        return quiet + 1
+
+    _scan_with_resets(n, step, min_block=16)
+    scores = detector._score(np.maximum(pos_out, neg_out))
+    return is_anomaly, scores, {pos_key: pos_out, neg_key: neg_out}
+
+
+class CUSUMDetector:
+    """Two-sided CUSUM change-point detector on robustly standardized residuals"""
+
+    DETAIL_KEYS = ('cusum_pos', 'cusum_neg')
+
+    def __init__(self, threshold=5.0, drift=1.0, halflife=10, clip=2.5, min_periods=100, scale_halflife=500):
+        self.threshold = threshold
+        self.drift = drift
+        self.halflife = halflife
+        self.clip = clip
+        self.min_periods = min_periods
+        self.scale_halflife = scale_halflife
+        self.residuals = ResidualScaler(halflife, clip, min_periods, scale_halflife)
+        self.g_pos = 0.0
+        self.g_neg = 0.0
+
+    def _score(self, statistic):
+        return np.minimum(0.5 * statistic / self.threshold, 1.0)
+
+    def _statistics(self, z):
+        """Cumulative sums over a quiet run of z-scores; commit(k) keeps the first k"""
+        pos = _lindley(self.g_pos, z - self.drift)
+        neg = _lindley(self.g_neg, -z - self.drift)
+
+        def commit(k):
+            if k:
+                self.g_pos, self.g_neg = float(pos[k - 1]), float(neg[k - 1])
+
+        return pos, neg, commit
+
+    def detect(self, value):
+        """Update the cumulative sums with one value; alarm resets them"""
+        z_score = self.residuals.standardize(value)
+        if z_score is None:
+            return False, 0.0, {'cusum_pos': 0.0, 'cusum_neg': 0.0}
+        # Clipping keeps a single spike from raising an alarm on its own
+        z = min(max(z_score, -self.clip), self.clip)
+        self.g_pos = max(0.0, self.g_pos + z - self.drift)
+        self.g_neg = max(0.0, self.g_neg - z - self.drift)
+        statistic = max(self.g_pos, self.g_neg)
+        details = {'cusum_pos': self.g_pos, 'cusum_neg': self.g_neg}
+        is_anomaly = statistic > self.threshold
+        if is_anomaly:
+            self.g_pos = self.g_neg = 0.0
+        self.residuals.absorb(value, z_score, is_anomaly)
+        return is_anomaly, float(self._score(statistic)), details
+
+    def detect_batch(self, values):
+        """Vectorized equivalent of calling detect() on each value in turn"""
+        return _detect_change_points(self, values)
+
+    def get_state(self):
+        residuals = self.residuals.get_state()
+        return {
+            'params': {'threshold': self.threshold, 'drift': self.drift, 'halflife': self.halflife,
+                       'clip': self.clip, 'min_periods': self.min_periods,
+                       'scale_halflife': self.scale_halflife},
+            'meta': {'g_pos': self.g_pos, 'g_neg': self.g_neg, 'residuals': residuals['meta']},
+            'arrays': residuals['arrays']
+        }
+
+    def set_state(self, state):
+        meta = state['meta']
+        self.g_pos = meta['g_pos']
+        self.g_neg = meta['g_neg']
+        self.residuals.set_state({'meta': meta['residuals'], 'arrays': state['arrays']})
+
+
+class PageHinkleyDetector:
+    """Two-sided Page-Hinkley change-point detector on robustly standardized residuals
+
+    The reference mean of the z-scores since the last alarm is shrunk toward
+    zero by halflife pseudo-points: the level already centres the residuals,
+    and a freshly reset mean would otherwise absorb the shift it should flag.
+    """
+
+    DETAIL_KEYS = ('ph_pos', 'ph_neg')
+
+    def __init__(self, threshold=5.0, delta=1.0, halflife=10, clip=3.0, min_periods=100, scale_halflife=500):
+        self.threshold = threshold
+        self.delta = delta
+        self.halflife = halflife
+        self.clip = clip
+        self.min_periods = min_periods
+        self.scale_halflife = scale_halflife
+        self.residuals = ResidualScaler(halflife, clip, min_periods, scale_halflife)
+        self._reset()
+
+    def _reset(self):
+        self.n = 0
+        self.total = 0.0
+        self.m_pos = self.min_pos = 0.0
+        self.m_neg = self.min_neg = 0.0
+
+    def _score(self, statistic):
+        return np.minimum(0.5 * statistic / self.threshold, 1.0)
+
+    def _statistics(self, z):
+        """Page-Hinkley sums over a quiet run of z-scores; commit(k) keeps the first k"""
+        counts = self.n + np.arange(1, len(z) + 1)
+        totals = self.total + np.cumsum(z)
+        dev = z - totals / (counts + self.halflife)
+        m_pos = self.m_pos + np.cumsum(dev - self.delta)
+        m_neg = self.m_neg + np.cumsum(-dev - self.delta)
+        min_pos = np.minimum(np.minimum.accumulate(m_pos), self.min_pos)
+        min_neg = np.minimum(np.minimum.accumulate(m_neg), self.min_neg)
+
+        def commit(k):
+            if k:
+                self.n, self.total = int(counts[k - 1]), float(totals[k - 1])
+                self.m_pos, self.min_pos = float(m_pos[k - 1]), float(min_pos[k - 1])
+                self.m_neg, self.min_neg = float(m_neg[k - 1]), float(min_neg[k - 1])
+
+        return m_pos - min_pos, m_neg - min_neg, commit
+
+    def detect(self, value):
+        """Update the Page-Hinkley sums with one value; alarm resets them"""
+        z_score = self.residuals.standardize(value)
+        if z_score is None:
+            return False, 0.0, {'ph_pos': 0.0, 'ph_neg': 0.0}
+        z = min(max(z_score, -self.clip), self.clip)
+        self.n += 1
+        self.total += z
+        dev = z - self.total / (self.n + self.halflife)
+        self.m_pos += dev - self.delta
+        self.m_neg += -dev - self.delta
+        self.min_pos = min(self.min_pos, self.m_pos)
+        self.min_neg = min(self.min_neg, self.m_neg)
+        ph_pos = self.m_pos - self.min_pos
+        ph_neg = self.m_neg - self.min_neg
+        statistic = max(ph_pos, ph_neg)
+        details = {'ph_pos': ph_pos, 'ph_neg': ph_neg}
+        is_anomaly = statistic > self.threshold
+        if is_anomaly:
+            self._reset()
+        self.residuals.absorb(value, z_score, is_anomaly)
+        return is_anomaly, float(self._score(statistic)), details
+
+    def detect_batch(self, values):
+        """Vectorized equivalent of calling detect() on each value in turn"""
+        return _detect_change_points(self, values)
+
+    def get_state(self):
+        residuals = self.residuals.get_state()
+        return {
+            'params': {'threshold': self.threshold, 'delta': self.delta, 'halflife': self.halflife,
+                       'clip': self.clip, 'min_periods': self.min_periods,
+                       'scale_halflife': self.scale_halflife},
+            'meta': {'n': self.n, 'total': self.total, 'm_pos': self.m_pos, 'min_pos': self.min_pos,
+                     'm_neg': self.m_neg, 'min_neg': self.min_neg, 'residuals': residuals['meta']},
+            'arrays': residuals['arrays']
+        }
+
+    def set_state(self, state):
+        meta = dict(state['meta'])
+        self.residuals.set_state({'meta': meta.pop('residuals'), 'arrays': state['arrays']})
+        for key, value in meta.items():
+            setattr(self, key, value)
+
+
+class DetectorBank:
+    """Statistical detector state for many series in contiguous 2-D arrays
+
+    Row i belongs to series i: a ring buffer of its last window_size values,
+    the same values kept sorted, and its running mean/M2. update() advances
+    every series by one tick in a single vectorized call and scores each one
+    the way StatisticalAnomalyDetector.detect would. All series tick together.
+    """
+
+    def __init__(self, n_series, window_size=100, z_threshold=3.0, iqr_multiplier=1.5, alpha=0.05):
+        self.n_series = n_series
+        self.window_size = window_size
+        self.z_threshold = z_threshold
+        self.iqr_multiplier = iqr_multiplier
+        self.alpha = alpha
+        self.grubbs_table = grubbs_critical_values(window_size, alpha)
+        self.ring = np.zeros((n_series, window_size))
+        # Unfilled slots hold +inf so they always sort to the end of a row
+        self.sorted = np.full((n_series, window_size), np.inf)
+        self.mean = np.zeros(n_series)
+        self.m2 = np.zeros(n_series)
+        self.count = 0
+
+    def nbytes(self):
+        return self.ring.nbytes + self.sorted.nbytes + self.mean.nbytes + self.m2.nbytes
+
+    def get_state(self):
+        return {
+            'params': {
+                'n_series': self.n_series, 'window_size': self.window_size,
+                'z_threshold': self.z_threshold, 'iqr_multiplier': self.iqr_multiplier,
+                'alpha': self.alpha
+            },
+            'meta': {'count': self.count},
+            'arrays': {'ring': self.ring, 'sorted': self.sorted, 'mean': self.mean, 'm2': self.m2}
+        }
+
+    def set_state(self, state):
+        self.count = state['meta']['count']
+        for key in ('ring', 'sorted', 'mean', 'm2'):
+            setattr(self, key, state['arrays'][key])
+
+    def update(self, values):
+        """Push one value per series and score it
+
+        Returns (is_anomaly, scores, details) arrays of length n_series.
+        """
+        values = np.asarray(values, dtype=float)
+        w = self.window_size
+        slot = self.count % w
+        full = self.count >= w
+
+        # Running moments (Welford add, or add+evict once the window is full)
+        if full:
+            evicted = self.ring[:, slot].copy()
+            delta = values - evicted
+            old_mean = self.mean.copy()
+            self.mean += delta / w
+            self.m2 += delta * (values - self.mean + evicted - old_mean)
+        else:
+            evicted = np.full(self.n_series, np.inf)
+            delta = values - self.mean
+            self.mean += delta / (self.count + 1)
+            self.m2 += delta * (values - self.mean)
+        self.ring[:, slot] = values
+        self.count += 1
+        if full and slot == w - 1:
+            # Rebuild once per rotation so rounding error stays bounded
+            self.mean = self.ring.mean(axis=1)
+            self.m2 = ((self.ring - self.mean[:, None]) ** 2).sum(axis=1)
+
+        # Sorted rows: drop the evicted value and insert the new one by
+        # shifting the span between the two positions (O(w) per row, no sort)
+        evict_pos = (self.sorted < evicted[:, None]).sum(axis=1)
+        insert_pos = (self.sorted < values[:, None]).sum(axis=1)
+        insert_pos -= evicted < values
+        cols = np.arange(w)[None, :]
+        p = evict_pos[:, None]
+        q = insert_pos[:, None]
+        source = cols - ((cols > q) & (cols <= p)) + ((cols >= p) & (cols < q))
+        self.sorted = np.take_along_axis(self.sorted, source, axis=1)
+        self.sorted[np.arange(self.n_series), insert_pos] = values
+
+        return self._score(values)
+
+    def _score(self, values):
+        n = min(self.count, self.window_size)
+        n_series = self.n_series
+        if n < 10:
+            empty = np.full(n_series, np.nan)
+            return np.zeros(n_series, dtype=bool), np.zeros(n_series), {
+                'z_score': empty, 'modified_z': empty.copy(),
+                'iqr_bounds': np.full((n_series, 2), np.nan), 'grubbs_stat': empty.copy(),
+                'methods_triggered': np.zeros(n_series, dtype=int)
+            }
+
+        ordered = self.sorted[:, :n]
+        std = np.sqrt(np.maximum(self.m2, 0.0) / n)
+        return score_window_rows(ordered, self.mean, std, values, self.z_threshold,
+                                 self.iqr_multiplier, self.grubbs_table[n])
+
+
+# Shared-memory segments attached by the current pool worker
+_WORKER_SEGMENTS = {}
+
+
+def _fit_shared_estimator(estimator, shm_name, shape, dtype):
+    """Process-pool worker: fit estimator on an array living in shared memory
+
+    Fitted estimators may keep a view of X (LOF does), so the segment stays
+    attached until the pool's workers exit at the end of fit.
+    """
+    shm = _WORKER_SEGMENTS.get(shm_name)
+    if shm is None:
+        shm = _WORKER_SEGMENTS[shm_name] = shared_memory.SharedMemory(name=shm_name)
+    X = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    return _fit_estimator(estimator, X)
+
+
+def _fit_estimator(estimator, X):
+    start = time.perf_counter()
+    estimator.fit(X)
+    return estimator, time.perf_counter() - start
+
+
+def window_feature_names(n_lags=5, windows=(5, 20)):
+    """Column names of the matrix built by window_features"""
+    names = ['value'] + [f'lag_{lag}' for lag in range(1, n_lags + 1)] + ['diff_1', 'diff_2']
+    for w in windows:
+        names += [f'dev_mean_{w}', f'std_{w}']
+    return names
+
+
+def window_features(values, n_lags=5, windows=(5, 20), out=None):
+    """Temporal feature matrix for a 1-D series, one row per point
+
+    Columns: the value, n_lags lagged values, first and second differences,
+    and for each rolling window the deviation from the rolling mean and the
+    rolling standard deviation (expanding until the window fills). Lags come
+    from a sliding_window_view over the series, rolling moments from cumulative
+    sums, and everything is written straight into one (n, n_features) buffer,
+    reused when passed as out; no n x w window copies are made.
+    """
+    x = np.asarray(values, dtype=float)
+    n = len(x)
+    n_features = 3 + n_lags + 2 * len(windows)
+    if out is None or out.shape != (n, n_features):
+        out = np.empty((n, n_features))
+    if n == 0:
+        return out
+
+    # Lags: row t of the view is x[t - n_lags .. t], front-padded with x[0]
+    padded = np.concatenate([np.full(n_lags, x[0]), x])
+    lags = np.lib.stride_tricks.sliding_window_view(padded, n_lags + 1)
+    out[:, :n_lags + 1] = lags[:, ::-1]
+
+    col = n_lags + 1
+    out[0, col] = 0.0
+    np.subtract(x[1:], x[:-1], out=out[1:, col])
+    out[:, col + 1] = out[:, col]
+    out[1:, col + 1] -= out[:-1, col]
+    col += 2
+
+    # Rolling moments from cumulative sums of the centred series (centring
+    # keeps the sum-of-squares form from cancelling on large levels)
+    centred = x - x.mean()
+    csum = np.concatenate([[0.0], np.cumsum(centred)])
+    csq = np.concatenate([[0.0], np.cumsum(centred * centred)])
+    ends = np.arange(1, n + 1)
+    for w in windows:
+        starts = np.maximum(ends - w, 0)
+        counts = ends - starts
+        mean = (csum[ends] - csum[starts]) / counts
+        var = (csq[ends] - csq[starts]) / counts - mean * mean
+        np.subtract(centred, mean, out=out[:, col])
+        np.sqrt(np.maximum(var, 0.0), out=out[:, col + 1])
+        col += 2
+    return out
+
+
+class ApproxOneClassSVM:
+    """One-Class SVM on random Fourier features with a linear SGD solver
+
+    RBFSampler approximates the RBF kernel with n_components random features
+    and SGDOneClassSVM solves the linear one-class problem in that space, so
+    fitting is linear in the number of samples instead of the exact solver's
+    roughly quadratic cost. The feature map is data-independent, which lets
+    partial_fit keep updating the same model from streaming batches.
+    """
+
+    def __init__(self, nu=0.1, gamma='auto', n_components=300, random_state=42):
+        self.nu = nu
+        self.gamma = gamma
+        self.n_components = n_components
+        self.random_state = random_state
+        self.sampler = None
+        self.sgd = SGDOneClassSVM(nu=nu, random_state=random_state)
+
+    def _features(self, X):
+        if self.sampler is None:
+            gamma = 1.0 / X.shape[1] if self.gamma == 'auto' else self.gamma
+            self.sampler = RBFSampler(gamma=gamma, n_components=self.n_components,
+                                      random_state=self.random_state).fit(X)
+        return self.sampler.transform(X)
+
+    def fit(self, X):
+        self.sampler = None
+        self.sgd = SGDOneClassSVM(nu=self.nu, random_state=self.random_state)
+        self.sgd.fit(self._features(X))
+        return self
+
+    def partial_fit(self, X):
+        """One SGD pass over a new batch, keeping the current model"""
+        self.sgd.partial_fit(self._features(X))
+        return self
+
+    def decision_function(self, X):
+        return self.sgd.decision_function(self._features(X))
+
+    def score_samples(self, X):
+        return self.sgd.score_samples(self._features(X))
+
+    def predict(self, X):
+        return self.sgd.predict(self._features(X))
+
+
+class ChunkedLOF:
+    """Novelty-mode Local Outlier Factor scored in chunks against a tree index
+
+    Produces the same scores as LocalOutlierFactor(novelty=True), but
+    neighbours are looked up in fixed-size chunks from a persisted KD-tree
+    (ball tree above 15 dimensions) by a pool of threads. Peak memory is
+    bounded by chunk_size * n_neighbors per worker instead of n * n_neighbors.
+    max_reference caps the fitted reference set with a random subsample, so
+    fit time stays fixed as history grows.
+    """
+
+    def __init__(self, n_neighbors=20, contamination=0.1, max_reference=None, chunk_size=10_000,
+                 n_jobs=None, leaf_size=30, random_state=42):
+        self.n_neighbors = n_neighbors
+        self.contamination = contamination
+        self.max_reference = max_reference
+        self.chunk_size = chunk_size
+        self.n_jobs = n_jobs if n_jobs is not None else (os.cpu_count() or 1)
+        self.leaf_size = leaf_size
+        self.random_state = random_state
+
+    def _chunks(self, n):
+        return [slice(start, min(start + self.chunk_size, n)) for start in range(0, n, self.chunk_size)]
+
+    def _map_chunks(self, fn, n):
+        chunks = self._chunks(n)
+        if self.n_jobs <= 1 or len(chunks) == 1:
+            for chunk in chunks:
+                fn(chunk)
+            return
+        with ThreadPoolExecutor(max_workers=self.n_jobs) as pool:
+            for _ in pool.map(fn, chunks):
+                pass
+
+    def fit(self, X):
+        X = np.asarray(X, dtype=float)
+        if self.max_reference is not None and len(X) > self.max_reference:
+            rng = np.random.default_rng(self.random_state)
+            X = X[np.sort(rng.choice(len(X), self.max_reference, replace=False))]
+        n = len(X)
+        k = self.n_neighbors_ = max(1, min(self.n_neighbors, n - 1))
+        tree_cls = KDTree if X.shape[1] <= 15 else BallTree
+        self.tree_ = tree_cls(X, leaf_size=self.leaf_size)
+
+        # Neighbours of the reference points themselves, excluding each point
+        # (like LocalOutlierFactor.kneighbors() with X=None)
+        self._neighbor_dist = np.empty((n, k))
+        self._neighbor_ind = np.empty((n, k), dtype=np.intp)
+
+        def query_reference(chunk):
+            dist, ind = self.tree_.query(X[chunk], k=k + 1)
+            keep = ind != np.arange(chunk.start, chunk.stop)[:, None]
+            keep[keep.all(axis=1), 0] = False
+            self._neighbor_dist[chunk] = dist[keep].reshape(-1, k)
+            self._neighbor_ind[chunk] = ind[keep].reshape(-1, k)
+
+        self._map_chunks(query_reference, n)
+        self._distances_fit_X_ = self._neighbor_dist
+        self._k_distance = self._neighbor_dist[:, -1]
+        self._lrd = self._local_reachability_density(self._neighbor_dist, self._neighbor_ind)
+        self.negative_outlier_factor_ = -np.mean(self._lrd[self._neighbor_ind] / self._lrd[:, None], axis=1)
+        if self.contamination == 'auto':
+            self.offset_ = -1.5
+        else:
+            self.offset_ = np.percentile(self.negative_outlier_factor_, 100.0 * self.contamination)
+        return self
+
+    def _local_reachability_density(self, dist, ind):
+        reach_dist = np.maximum(dist, self._k_distance[ind])
+        return 1.0 / (np.mean(reach_dist, axis=1) + 1e-10)
+
+    def score_samples(self, X):
+        """Opposite of the LOF of each sample (lower is more abnormal)"""
+        X = np.asarray(X, dtype=float)
+        scores = np.empty(len(X))
+
+        def score_chunk(chunk):
+            dist, ind = self.tree_.query(X[chunk], k=self.n_neighbors_)
+            lrd = self._local_reachability_density(dist, ind)
+            scores[chunk] = -np.mean(self._lrd[ind] / lrd[:, None], axis=1)
+
+        self._map_chunks(score_chunk, len(X))
+        return scores
+
+    def decision_function(self, X):
+        return self.score_samples(X) - self.offset_
+
+    def predict(self, X):
+        return np.where(self.decision_function(X) < 0, -1, 1)
+
+    def get_state(self):
+        """Fitted reference as plain arrays; set_state rebuilds the tree from them"""
+        if not hasattr(self, 'tree_'):
+            return {'meta': {'fitted': False}, 'arrays': {}}
+        return {
+            'meta': {'fitted': True, 'offset_': float(self.offset_), 'n_neighbors_': int(self.n_neighbors_)},
+            'arrays': {
+                'fit_X': np.asarray(self.tree_.data),
+                'lrd': self._lrd,
+                'k_distance': self._k_distance,
+                'neighbor_dist': self._neighbor_dist,
+                'neighbor_ind': self._neighbor_ind,
+                'negative_outlier_factor': self.negative_outlier_factor_
+            }
+        }
+
+    def set_state(self, state):
+        if not state['meta'].get('fitted'):
+            return
+        arrays = state['arrays']
+        X = np.array(arrays['fit_X'])
+        tree_cls = KDTree if X.shape[1] <= 15 else BallTree
+        self.tree_ = tree_cls(X, leaf_size=self.leaf_size)
+        self.offset_ = state['meta']['offset_']
+        self.n_neighbors_ = state['meta']['n_neighbors_']
+        self._lrd = np.array(arrays['lrd'])
+        self._k_distance = np.array(arrays['k_distance'])
+        self._neighbor_dist = self._distances_fit_X_ = np.array(arrays['neighbor_dist'])
+        self._neighbor_ind = np.array(arrays['neighbor_ind'])
+        self.negative_outlier_factor_ = np.array(arrays['negative_outlier_factor'])
+
 
 class MLAnomalyDetector:
     """Machine Learning based anomaly detection"""
     
-    def __init__(self, contamination=0.1):
+    MODELS = ('isolation_forest', 'elliptic_envelope', 'lof', 'one_class_svm')
+    
+    def __init__(self, contamination=0.1, n_jobs=None, backend='thread', svm_backend='exact',
+                 svm_components=300, lof_max_reference=None, feature_lags=0, feature_windows=(20,)):
         self.contamination = contamination
+        # The four models train concurrently on threads, or with
+        # backend='process' the sklearn estimators fit in worker processes
+        # reading the training matrix from shared memory (fit_warning says
+        # when that was unavailable and the fit ran on threads instead)
+        self.n_jobs = n_jobs if n_jobs is not None else min(len(self.MODELS), os.cpu_count() or 1)
+        if backend not in ('thread', 'process'):
+            raise ValueError(f"Unknown backend: {backend!r}")
+        self.backend = backend
+        self.fit_times = {}
+        self.fit_warning = None
         self.isolation_forest = IsolationForest(
             contamination=contamination,
             random_state=42,
@@ -1188,57 +2952,219 @@ class MLAnomalyDetector:
             contamination=contamination,
             random_state=42
         )
-        self.lof = LocalOutlierFactor(
+        # Same scores as LocalOutlierFactor(novelty=True), with chunked
+        # tree queries and an optional cap on the reference set
+        self.lof = ChunkedLOF(
             n_neighbors=20,
             contamination=contamination,
-            novelty=True
-        )
-        self.one_class_svm = OneClassSVM(
-            kernel='rbf',
-            gamma='auto',
-            nu=contamination
+            max_reference=lof_max_reference
         )
+        self.lof_max_reference = lof_max_reference
+        # 'approx' swaps the exact RBF One-Class SVM (roughly quadratic in the
+        # training size) for a linear-time random-feature approximation
+        if svm_backend == 'exact':
+            self.one_class_svm = OneClassSVM(
+                kernel='rbf',
+                gamma='auto',
+                nu=contamination
+            )
+        elif svm_backend == 'approx':
+            self.one_class_svm = ApproxOneClassSVM(nu=contamination, n_components=svm_components)
+        else:
+            raise ValueError(f"Unknown svm_backend: {svm_backend!r}")
+        self.svm_backend = svm_backend
+        self.svm_components = svm_components
+        # Training scores per model, so a new contamination only moves the
+        # decision thresholds (see set_contamination) instead of refitting
+        self.fit_contamination = contamination
+        self.train_scores = {}
+        self.score_offsets = {}
+        self.thresholds = {}
         self.fitted = False
         self.scaler = StandardScaler()
+        # 1-D series are expanded into lag / difference / rolling-stat
+        # features so the models see temporal context (feature_lags=0 and
+        # feature_windows=() give the plain single column)
+        self.feature_lags = feature_lags
+        self.feature_windows = tuple(feature_windows)
+        self._feature_buffer = None
+        
+    def _features(self, X):
+        X = np.asarray(X, dtype=float)
+        if X.ndim > 1:
+            return X
+        if not self.feature_lags and not self.feature_windows:
+            return X.reshape(-1, 1)
+        self._feature_buffer = window_features(X, self.feature_lags, self.feature_windows,
+                                               out=self._feature_buffer)
+        return self._feature_buffer
         
     def fit(self, X):
         """Fit all models on training data"""
         if len(X) < 50:
             return False
             
-        X_scaled = self.scaler.fit_transform(X.reshape(-1, 1) if len(X.shape) == 1 else X)
+        X_scaled = self.scaler.fit_transform(self._features(X))
         
+        start = time.perf_counter()
+        self.fit_warning = None
         try:
-            self.isolation_forest.fit(X_scaled)
-            self.elliptic_envelope.fit(X_scaled)
-            self.lof.fit(X_scaled)
-            self.one_class_svm.fit(X_scaled)
-            self.fitted = True
-            return True
+            if self.n_jobs <= 1:
+                results = [_fit_estimator(getattr(self, name), X_scaled) for name in self.MODELS]
+            elif self.backend == 'process':
+                try:
+                    results = self._fit_processes(X_scaled)
+                except Exception as exc:
+                    self.fit_warning = (f"Process backend unavailable ({type(exc).__name__}: {exc}); "
+                                        f"models were fitted on threads")
+                    results = self._fit_threads(X_scaled, self.MODELS)
+            else:
+                results = self._fit_threads(X_scaled, self.MODELS)
         except Exception as e:
             return False
+        
+        self.fit_times = {}
+        for name, (estimator, elapsed) in zip(self.MODELS, results):
+            setattr(self, name, estimator)
+            self.fit_times[name] = elapsed
+        self.fit_times['total'] = time.perf_counter() - start
+        
+        # The estimators were built with (and cut their offsets at) the
+        # contamination passed to the constructor
+        self.fit_contamination = self.isolation_forest.contamination
+        self.train_scores = {}
+        self.score_offsets = {}
+        for name in self.MODELS:
+            try:
+                self._record_scores(name, X_scaled)
+            except Exception:
+                continue
+        self.fitted = True
+        self.set_contamination(self.contamination)
+        return True
+    
+    def _record_scores(self, name, X_scaled):
+        """Cache a model's sorted training scores and native offset for set_contamination"""
+        model = getattr(self, name)
+        # Novelty-mode LOF cuts its offset from the training points'
+        # own (leave-one-out) factors, not from score_samples on them
+        if name == 'lof':
+            train_scores = np.sort(model.negative_outlier_factor_)
+        else:
+            train_scores = np.sort(model.score_samples(X_scaled))
+        # score_samples - decision_function: the model's native cut-off
+        self.score_offsets[name] = float(
+            model.score_samples(X_scaled[:1])[0] - model.decision_function(X_scaled[:1])[0]
+        )
+        self.train_scores[name] = train_scores
+    
+    def partial_fit(self, X):
+        """Update the approximate One-Class SVM with a new batch, keeping the ensemble in sync
+
+        The batch goes through the fitted feature map and scaler, the SVM
+        takes one SGD pass over it, and its cached scores (now taken on this
+        batch) and offset are recomputed so its threshold follows the
+        updated boundary. The other models keep their fit. An unfitted
+        detector is fitted on the batch instead.
+        """
+        if not self.fitted:
+            self.fit(X)
+            return self
+        if self.svm_backend != 'approx':
+            raise ValueError("partial_fit needs svm_backend='approx'")
+        X_scaled = self.scaler.transform(self._features(X))
+        self.one_class_svm.partial_fit(X_scaled)
+        self._record_scores('one_class_svm', X_scaled)
+        self.set_contamination(self.contamination)
+        return self
+    
+    def set_contamination(self, contamination):
+        """Re-derive every model's decision threshold for a new contamination
+
+        Each threshold is the model's native offset moved by the difference
+        between the training-score quantiles at the new and the fitted
+        contamination. For Isolation Forest, LOF and Elliptic Envelope the
+        native offset is that quantile, so this equals refitting; the SVM
+        keeps its fitted boundary shape and only its cut-off moves.
+        """
+        self.contamination = contamination
+        self.thresholds = {
+            name: np.percentile(scores, 100.0 * contamination)
+            + (self.score_offsets[name] - np.percentile(scores, 100.0 * self.fit_contamination))
+            for name, scores in self.train_scores.items()
+        }
+    
+    def _fit_threads(self, X_scaled, names):
+        """Fit the named models on a thread pool, returning (estimator, seconds) pairs"""
+        with ThreadPoolExecutor(max_workers=max(1, min(self.n_jobs, len(names)))) as pool:
+            futures = [pool.submit(_fit_estimator, getattr(self, name), X_scaled) for name in names]
+            return [future.result() for future in futures]
+    
+    def _fit_processes(self, X_scaled):
+        """Fit sklearn estimators in worker processes that map X_scaled from shared memory
+
+        Only sklearn's own estimators cross the process boundary. Classes
+        defined in this script (ChunkedLOF, ApproxOneClassSVM) cannot be
+        pickled by reference once Streamlit re-executes it, so they fit on
+        threads here while the workers run.
+        """
+        X_scaled = np.ascontiguousarray(X_scaled)
+        remote = [name for name in self.MODELS
+                  if type(getattr(self, name)).__module__.startswith('sklearn.')]
+        local = [name for name in self.MODELS if name not in remote]
+        # A detector kept in session state holds methods from an earlier run;
+        # pickle looks the worker up by name, so take the current run's copy
+        worker = getattr(sys.modules.get(_fit_shared_estimator.__module__),
+                         '_fit_shared_estimator', _fit_shared_estimator)
+        shm = shared_memory.SharedMemory(create=True, size=max(X_scaled.nbytes, 1))
+        try:
+            np.ndarray(X_scaled.shape, dtype=X_scaled.dtype, buffer=shm.buf)[:] = X_scaled
+            with ProcessPoolExecutor(max_workers=max(1, min(self.n_jobs, len(remote)))) as pool:
+                futures = [
+                    pool.submit(worker, getattr(self, name), shm.name, X_scaled.shape, X_scaled.dtype)
+                    for name in remote
+                ]
+                results = dict(zip(local, self._fit_threads(X_scaled, local))) if local else {}
+                results.update(zip(remote, [future.result() for future in futures]))
+            return [results[name] for name in self.MODELS]
+        finally:
+            shm.close()
+            shm.unlink()
             
+    def raw_scores(self, X):
+        """Threshold-free anomaly score per model (-score_samples, higher is more abnormal)"""
+        if not self.fitted:
+            return {}
+        
+        X_scaled = self.scaler.transform(self._features(X))
+        scores = {}
+        for name in self.MODELS:
+            if name not in self.thresholds:
+                continue
+            try:
+                scores[name] = -getattr(self, name).score_samples(X_scaled)
+            except Exception:
+                continue
+        return scores
+    
+    def model_scores(self, X):
+        """Continuous anomaly score per model, positive past its threshold"""
+        return {name: self.thresholds[name] + raw for name, raw in self.raw_scores(X).items()}
+    
     def detect(self, X):
         """Detect anomalies using ensemble of ML methods"""
         if not self.fitted:
             return np.zeros(len(X)), np.zeros(len(X))
             
-        X_scaled = self.scaler.transform(X.reshape(-1, 1) if len(X.shape) == 1 else X)
-        
-        # Get predictions from each model (-1 for anomaly, 1 for normal)
-        if_pred = self.isolation_forest.predict(X_scaled)
-        if_scores = -self.isolation_forest.score_samples(X_scaled)
-        
-        try:
-            ee_pred = self.elliptic_envelope.predict(X_scaled)
-        except Exception:
-            ee_pred = np.ones(len(X))
-            
-        lof_pred = self.lof.predict(X_scaled)
-        svm_pred = self.one_class_svm.predict(X_scaled)
+        # Get predictions from each model (-1 for anomaly, 1 for normal),
+        # cutting the continuous scores at the current contamination
+        model_scores = self.model_scores(X)
+        votes = np.ones((len(self.MODELS), len(X)))
+        for row, name in enumerate(self.MODELS):
+            if name in model_scores:
+                votes[row] = np.where(model_scores[name] > 0, -1, 1)
         
         # Ensemble voting
-        votes = np.vstack([if_pred, ee_pred, lof_pred, svm_pred])
         ensemble_pred = np.sum(votes == -1, axis=0) / 4  # Proportion voting anomaly
         
         # Binary prediction (majority vote)
@@ -1246,51 +3172,985 @@ class MLAnomalyDetector:
         
         return is_anomaly, ensemble_pred
 
+    def get_state(self):
+        """Checkpoint state: the fitted estimators and scaler
+
+        Only sklearn objects are pickled: Streamlit re-executes app.py on
+        every rerun, so instances of classes defined here no longer match the
+        current class and cannot be pickled. LOF is stored as arrays and the
+        approximate SVM as its sklearn sampler and SGD model.
+        """
+        objects = {
+            'isolation_forest': self.isolation_forest,
+            'elliptic_envelope': self.elliptic_envelope,
+            'scaler': self.scaler
+        }
+        if self.svm_backend == 'approx':
+            objects['svm_sampler'] = self.one_class_svm.sampler
+            objects['svm_sgd'] = self.one_class_svm.sgd
+        else:
+            objects['one_class_svm'] = self.one_class_svm
+        lof_state = self.lof.get_state()
+        arrays = {f'train_scores_{name}': scores for name, scores in self.train_scores.items()}
+        arrays.update({f'lof_{key}': array for key, array in lof_state['arrays'].items()})
+        return {
+            'params': {'contamination': self.contamination, 'n_jobs': self.n_jobs,
+                       'backend': self.backend, 'svm_backend': self.svm_backend,
+                       'svm_components': self.svm_components, 'lof_max_reference': self.lof_max_reference,
+                       'feature_lags': self.feature_lags, 'feature_windows': list(self.feature_windows)},
+            'meta': {'fitted': self.fitted, 'fit_times': self.fit_times, 'fit_warning': self.fit_warning,
+                     'fit_contamination': self.fit_contamination, 'score_offsets': self.score_offsets,
+                     'lof': lof_state['meta']},
+            'arrays': arrays,
+            'objects': objects
+        }
+
+    def set_state(self, state):
+        self.fitted = state['meta']['fitted']
+        self.fit_times = state['meta'].get('fit_times', {})
+        self.fit_warning = state['meta'].get('fit_warning')
+        objects = dict(state['objects'])
+        if 'svm_sgd' in objects:
+            svm = ApproxOneClassSVM(nu=state['meta'].get('fit_contamination', self.contamination),
+                                    n_components=self.svm_components)
+            svm.sampler = objects.pop('svm_sampler')
+            svm.sgd = objects.pop('svm_sgd')
+            objects['one_class_svm'] = svm
+        for key, estimator in objects.items():
+            setattr(self, key, estimator)
+        if 'lof' in state['meta']:
+            self.lof.set_state({'meta': state['meta']['lof'], 'arrays': {
+                key[len('lof_'):]: array for key, array in state.get('arrays', {}).items() if key.startswith('lof_')
+            }})
+        self.fit_contamination = state['meta'].get('fit_contamination', self.contamination)
+        self.score_offsets = dict(state['meta'].get('score_offsets', {}))
+        self.train_scores = {
+            name: np.asarray(state['arrays'][f'train_scores_{name}'])
+            for name in self.MODELS if f'train_scores_{name}' in state.get('arrays', {})
+        }
+        self.set_contamination(self.contamination)
+
+
+def benchmark_svm_backends(sizes=(10_000, 100_000, 1_000_000), nu=0.1, n_features=4,
+                           exact_max_samples=20_000, svm_components=300, seed=0):
+    """Time the exact and approximate One-Class SVM backends on growing data
+
+    The exact solver is only run up to exact_max_samples (beyond that it takes
+    minutes to hours). Agreement is the share of a fixed evaluation sample on
+    which the approximate model's predictions match the exact model's, with the
+    exact model fitted on the largest size it was run at.
+    """
+    rng = np.random.default_rng(seed)
+    evaluation = rng.standard_normal((10_000, n_features))
+    exact_predictions = None
+    results = []
+    for n in sizes:
+        X = rng.standard_normal((n, n_features))
+        row = {'n_samples': n, 'exact_fit_s': None, 'agreement': None}
+
+        if n <= exact_max_samples:
+            start = time.perf_counter()
+            exact = OneClassSVM(kernel='rbf', gamma='auto', nu=nu).fit(X)
+            row['exact_fit_s'] = time.perf_counter() - start
+            exact_predictions = exact.predict(evaluation)
+
+        start = time.perf_counter()
+        approx = ApproxOneClassSVM(nu=nu, n_components=svm_components).fit(X)
+        row['approx_fit_s'] = time.perf_counter() - start
+        start = time.perf_counter()
+        approx_predictions = approx.predict(evaluation)
+        row['approx_predict_us'] = 1e6 * (time.perf_counter() - start) / len(evaluation)
+        row['approx_outlier_rate'] = float(np.mean(approx_predictions == -1))
+        if exact_predictions is not None:
+            row['agreement'] = float(np.mean(approx_predictions == exact_predictions))
+        results.append(row)
+    return results
+
+
+class HalfSpaceTrees:
+    """Streaming isolation-style detector: an ensemble of half-space trees
+
+    Each tree halves a randomly perturbed workspace along random features
+    down to a fixed depth, and counts how many points of a window land in
+    every node. Points are scored against the mass profile of the previous
+    full window (sparse regions score high) while the current window's
+    profile accumulates; at each window boundary the latest profile
+    replaces the reference, so old data is forgotten automatically. All
+    trees are stored as flat arrays and walked together, so a point costs
+    O(trees * depth) and a batch is a handful of vectorized steps per level.
+    Anomalies are scores above the (1 - contamination) quantile of the
+    scores seen in the previous window.
+    """
+
+    def __init__(self, n_trees=25, depth=12, window_size=100, size_limit=None, contamination=0.1,
+                 feature_lags=0, feature_windows=(20,), seed=42):
+        self.n_trees = n_trees
+        self.depth = depth
+        self.window_size = window_size
+        self.size_limit = size_limit if size_limit is not None else 0.1 * window_size
+        self.contamination = contamination
+        self.feature_lags = feature_lags
+        self.feature_windows = tuple(feature_windows)
+        self.seed = seed
+        n_nodes = 2 ** (depth + 1) - 1
+        self.r_mass = np.zeros((n_trees, n_nodes))
+        self.l_mass = np.zeros((n_trees, n_nodes))
+        self.split_dim = None
+        self.split_val = None
+        self.low = None
+        self.span = None
+        self.count = 0
+        self.threshold = None
+        self.window_scores = np.zeros(window_size)
+        self._warmup = []
+        self._has_reference = False
+        # Raw values carried between calls so 1-D features see their history
+        self._context = np.zeros(0)
+        self._context_size = max([w - 1 for w in self.feature_windows] + [feature_lags, 2])
+        # Normalizer: the largest possible path score
+        self._max_score = n_trees * window_size * (2 ** (depth + 1) - 1)
+
+    def _features(self, X):
+        X = np.asarray(X, dtype=float)
+        if X.ndim > 1:
+            return X
+        if not self.feature_lags and not self.feature_windows:
+            return X.reshape(-1, 1)
+        series = np.concatenate([self._context, X])
+        self._context = series[-self._context_size:]
+        return window_features(series, self.feature_lags, self.feature_windows)[len(series) - len(X):]
+
+    def _build(self, X):
+        """Grow the random trees over a workspace perturbed around the first window"""
+        rng = np.random.default_rng(self.seed)
+        n_features = X.shape[1]
+        self.low = X.min(axis=0)
+        self.span = np.where(X.max(axis=0) > self.low, X.max(axis=0) - self.low, 1.0)
+
+        n_internal = 2 ** self.depth - 1
+        self.split_dim = rng.integers(0, n_features, size=(self.n_trees, n_internal))
+        self.split_val = np.empty((self.n_trees, n_internal))
+        s = rng.random((self.n_trees, n_features))
+        reach = 2 * np.maximum(s, 1 - s)
+        node_min = np.repeat((s - reach)[:, None, :], n_internal, axis=1)
+        node_max = np.repeat((s + reach)[:, None, :], n_internal, axis=1)
+        trees = np.arange(self.n_trees)
+        for node in range(n_internal):
+            dim = self.split_dim[:, node]
+            lo = node_min[trees, node, dim]
+            hi = node_max[trees, node, dim]
+            mid = (lo + hi) / 2
+            self.split_val[:, node] = mid
+            for child, is_right in ((2 * node + 1, False), (2 * node + 2, True)):
+                if child >= n_internal:
+                    continue
+                node_min[:, child] = node_min[:, node]
+                node_max[:, child] = node_max[:, node]
+                if is_right:
+                    node_min[trees, child, dim] = mid
+                else:
+                    node_max[trees, child, dim] = mid
+
+    def _paths(self, X):
+        """Node index at every level for each (point, tree): shape (n, trees, depth + 1)"""
+        Xs = ((X - self.low) / self.span).ravel()
+        n = len(X)
+        # Flat take() lookups keep the per-level overhead low for single points
+        split_dim = self.split_dim.ravel()
+        split_val = self.split_val.ravel()
+        tree_offset = np.arange(self.n_trees) * self.split_dim.shape[1]
+        row_offset = np.arange(n)[:, None] * X.shape[1]
+        paths = np.zeros((n, self.n_trees, self.depth + 1), dtype=np.intp)
+        node = np.zeros((n, self.n_trees), dtype=np.intp)
+        for level in range(self.depth):
+            flat = node + tree_offset
+            go_right = Xs.take(split_dim.take(flat) + row_offset) > split_val.take(flat)
+            node = 2 * node + 1 + go_right
+            paths[:, :, level + 1] = node
+        return paths
+
+    def _score(self, paths):
+        masses = self.r_mass[np.arange(self.n_trees)[None, :, None], paths]
+        # Walk down until (and including) the first node below size_limit
+        below = masses < self.size_limit
+        stop = np.where(below.any(axis=2), below.argmax(axis=2), self.depth)
+        levels = np.arange(self.depth + 1)
+        weighted = masses * (2.0 ** levels) * (levels <= stop[:, :, None])
+        return 1.0 - weighted.sum(axis=(1, 2)) / self._max_score
+
+    def _learn(self, paths):
+        flat = (np.arange(self.n_trees)[None, :, None] * self.l_mass.shape[1] + paths).ravel()
+        if 8 * len(flat) < self.l_mass.size:
+            np.add.at(self.l_mass.reshape(-1), flat, 1)
+        else:
+            self.l_mass += np.bincount(flat, minlength=self.l_mass.size).reshape(self.l_mass.shape)
+
+    def _roll_window(self):
+        self.r_mass = self.l_mass
+        self.l_mass = np.zeros_like(self.r_mass)
+        if self._has_reference:
+            self.threshold = float(np.quantile(self.window_scores, 1 - self.contamination))
+        self._has_reference = True
+
+    def detect(self, X):
+        """Score points in arrival order and absorb them into the model
+
+        Returns (is_anomaly, scores) like the other ensemble detectors;
+        scores are 0 while the first window is being collected.
+        """
+        X = self._features(X)
+        n = len(X)
+        scores = np.zeros(n)
+        is_anomaly = np.zeros(n, dtype=int)
+        w = self.window_size
+        start = 0
+
+        # First window: only used to size the workspace and seed the masses
+        if self.split_dim is None:
+            take = min(n, w - len(self._warmup))
+            self._warmup.extend(X[:take])
+            self.count += take
+            start = take
+            if len(self._warmup) < w:
+                return is_anomaly, scores
+            warmup = np.array(self._warmup)
+            self._warmup = []
+            self._build(warmup)
+            self._learn(self._paths(warmup))
+            self._roll_window()
+
+        # Remaining points in segments that never cross a window boundary
+        while start < n:
+            offset = self.count % w
+            stop = min(n, start + w - offset)
+            paths = self._paths(X[start:stop])
+            segment_scores = self._score(paths)
+            scores[start:stop] = segment_scores
+            if self.threshold is not None:
+                is_anomaly[start:stop] = segment_scores > self.threshold
+            self.window_scores[offset:offset + stop - start] = segment_scores
+            self._learn(paths)
+            self.count += stop - start
+            if self.count % w == 0:
+                self._roll_window()
+            start = stop
+        return is_anomaly, scores
+
+    def partial_fit(self, X):
+        """Absorb points without needing their scores"""
+        self.detect(X)
+        return self
+
+    def get_state(self):
+        arrays = {'r_mass': self.r_mass, 'l_mass': self.l_mass, 'window_scores': self.window_scores,
+                  'context': self._context}
+        if self.split_dim is not None:
+            arrays.update(split_dim=self.split_dim, split_val=self.split_val, low=self.low, span=self.span)
+        if self._warmup:
+            arrays['warmup'] = np.array(self._warmup)
+        return {
+            'params': {'n_trees': self.n_trees, 'depth': self.depth, 'window_size': self.window_size,
+                       'size_limit': self.size_limit, 'contamination': self.contamination,
+                       'feature_lags': self.feature_lags, 'feature_windows': list(self.feature_windows),
+                       'seed': self.seed},
+            'meta': {'count': self.count, 'threshold': self.threshold, 'has_reference': self._has_reference},
+            'arrays': arrays
+        }
+
+    def set_state(self, state):
+        arrays = state['arrays']
+        for key in ('r_mass', 'l_mass', 'window_scores', 'split_dim', 'split_val', 'low', 'span'):
+            if key in arrays:
+                setattr(self, key, np.array(arrays[key]))
+        self._warmup = list(np.array(arrays['warmup'])) if 'warmup' in arrays else []
+        self._context = np.array(arrays['context'])
+        self.count = state['meta']['count']
+        self.threshold = state['meta']['threshold']
+        self._has_reference = state['meta']['has_reference']
+
+
+class MatrixProfileDetector:
+    """Subsequence discords from the matrix profile (z-normalized distance)
+
+    The profile holds, for every length-m subsequence, the distance to its
+    nearest non-trivial neighbour; discords are the subsequences with the
+    largest distances. The first row of dot products comes from one FFT
+    sliding dot product, and every diagonal of the distance matrix follows
+    from it by a running sum (STOMP/SCRIMP), so the O(n^2) computation only
+    ever holds O(n) values. Diagonals are dealt round-robin to threads that
+    keep private profiles, reduced with a minimum at the end. Appended
+    points are folded in with one MASS distance profile each.
+    """
+
+    def __init__(self, window_size=32, top_k=5, exclusion=None, n_jobs=None):
+        self.window_size = window_size
+        self.top_k = top_k
+        self.exclusion = exclusion
+        self.n_jobs = n_jobs
+        self.series = np.zeros(0)
+        self.profile = np.zeros(0)
+        self.profile_index = np.zeros(0, dtype=np.int64)
+        self.fitted = False
+
+    def _exclusion(self):
+        return self.exclusion if self.exclusion is not None else int(np.ceil(self.window_size / 4))
+
+    def _moments(self):
+        windows = np.lib.stride_tricks.sliding_window_view(self.series, self.window_size)
+        self._mean = windows.mean(axis=1)
+        self._std = np.maximum(windows.std(axis=1), 1e-12)
+
+    def _distances(self, qt, mean_i, std_i, mean_j, std_j):
+        m = self.window_size
+        corr = np.clip((qt - m * mean_i * mean_j) / (m * std_i * std_j), -1.0, 1.0)
+        return np.sqrt(2.0 * m * (1.0 - corr))
+
+    def _scan_diagonals(self, diagonals, first_row):
+        """Profile and index over the given diagonals (j - i = k)"""
+        T, m = self.series, self.window_size
+        n_sub = len(first_row)
+        profile = np.full(n_sub, np.inf)
+        index = np.full(n_sub, -1, dtype=np.int64)
+        positions = np.arange(n_sub)
+        for k in diagonals:
+            length = n_sub - k
+            qt = np.empty(length)
+            qt[0] = first_row[k]
+            np.cumsum(T[m:m + length - 1] * T[k + m:k + m + length - 1]
+                      - T[:length - 1] * T[k:k + length - 1], out=qt[1:])
+            qt[1:] += first_row[k]
+            dist = self._distances(qt, self._mean[:length], self._std[:length], self._mean[k:], self._std[k:])
+            better = dist < profile[:length]
+            profile[:length] = np.where(better, dist, profile[:length])
+            index[:length] = np.where(better, positions[k:], index[:length])
+            better = dist < profile[k:]
+            profile[k:] = np.where(better, dist, profile[k:])
+            index[k:] = np.where(better, positions[:length], index[k:])
+        return profile, index
+
+    def fit(self, X):
+        """Compute the matrix profile of the whole series"""
+        self.series = np.asarray(X, dtype=np.float64).ravel().copy()
+        m = self.window_size
+        if len(self.series) < 2 * m:
+            self.fitted = False
+            return False
+        self._moments()
+        first_row = fftconvolve(self.series, self.series[m - 1::-1], mode='valid')
+        diagonals = np.arange(self._exclusion() + 1, len(first_row))
+        
+        n_workers = max(1, min(self.n_jobs or os.cpu_count() or 1, len(diagonals) // 256 or 1))
+        if n_workers == 1:
+            self.profile, self.profile_index = self._scan_diagonals(diagonals, first_row)
+        else:
+            # NumPy releases the GIL inside the per-diagonal array operations
+            with ThreadPoolExecutor(max_workers=n_workers) as executor:
+                parts = list(executor.map(
+                    lambda w: self._scan_diagonals(diagonals[w::n_workers], first_row), range(n_workers)
+                ))
+            profiles = np.vstack([p for p, _ in parts])
+            best = np.argmin(profiles, axis=0)
+            self.profile = profiles[best, np.arange(profiles.shape[1])]
+            self.profile_index = np.vstack([i for _, i in parts])[best, np.arange(profiles.shape[1])]
+        self.fitted = True
+        return True
+
+    def update(self, values):
+        """Append points, updating the profile with one MASS pass per new subsequence"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if not self.fitted:
+            return self.fit(np.concatenate([self.series, values]))
+        m, excl = self.window_size, self._exclusion()
+        self.series = np.concatenate([self.series, values])
+        self._moments()
+        for start in range(len(self.profile), len(self.series) - m + 1):
+            qt = fftconvolve(self.series, self.series[start:start + m][::-1], mode='valid')
+            dist = self._distances(qt, self._mean, self._std, self._mean[start], self._std[start])
+            dist[max(0, start - excl):] = np.inf
+            previous = len(self.profile)
+            better = dist[:previous] < self.profile
+            self.profile = np.where(better, dist[:previous], self.profile)
+            self.profile_index = np.where(better, start, self.profile_index)
+            nearest = int(np.argmin(dist[:previous])) if previous else -1
+            self.profile = np.append(self.profile, dist[nearest] if previous else np.inf)
+            self.profile_index = np.append(self.profile_index, nearest)
+        return True
+
+    def discords(self, k=None):
+        """Top-k non-overlapping discords as (start, distance), largest first"""
+        k = self.top_k if k is None else k
+        profile = np.where(np.isfinite(self.profile), self.profile, -np.inf)
+        found = []
+        for _ in range(k):
+            start = int(np.argmax(profile))
+            if not np.isfinite(profile[start]):
+                break
+            found.append((start, float(profile[start])))
+            profile[max(0, start - self.window_size + 1):start + self.window_size] = -np.inf
+        return found
+
+    def detect(self, X):
+        """Flag points inside the top-k discords
+
+        Each point scores the profile of the most unusual subsequence
+        covering it, relative to the k-th discord distance. X extending the
+        fitted series is handled incrementally; any other X is refitted.
+        """
+        X = np.asarray(X, dtype=np.float64).ravel()
+        n_fitted = len(self.series)
+        if not (self.fitted and len(X) >= n_fitted and np.array_equal(X[:n_fitted], self.series)):
+            self.fit(X)
+        elif len(X) > n_fitted:
+            self.update(X[n_fitted:])
+        if not self.fitted:
+            return np.zeros(len(X), dtype=int), np.zeros(len(X))
+        
+        m = self.window_size
+        profile = np.where(np.isfinite(self.profile), self.profile, 0.0)
+        padded = np.concatenate([np.zeros(m - 1), profile, np.zeros(m - 1)])
+        point_profile = np.lib.stride_tricks.sliding_window_view(padded, m).max(axis=1)
+        found = self.discords()
+        cutoff = found[-1][1] if found else np.inf
+        is_anomaly = np.zeros(len(X), dtype=int)
+        for start, _ in found:
+            is_anomaly[start:start + m] = 1
+        return is_anomaly, np.clip(point_profile / max(cutoff, 1e-12), 0, 2)
+
+    def get_state(self):
+        return {
+            'params': {'window_size': self.window_size, 'top_k': self.top_k,
+                       'exclusion': self.exclusion, 'n_jobs': self.n_jobs},
+            'meta': {'fitted': self.fitted},
+            'arrays': {'series': self.series, 'profile': self.profile, 'profile_index': self.profile_index}
+        }
+
+    def set_state(self, state):
+        arrays = state['arrays']
+        self.fitted = state['meta']['fitted']
+        self.series = np.array(arrays['series'])
+        self.profile = np.array(arrays['profile'])
+        self.profile_index = np.array(arrays['profile_index'])
+        if self.fitted:
+            self._moments()
+
+
+def centred_windows(values, window_size, center=0.0, scale=1.0, dtype=np.float64):
+    """Sliding windows of the standardized series, each with its level removed
+
+    Removing the window mean lets reconstruction models learn shape rather
+    than trend.
+    """
+    x = (np.asarray(values, dtype=dtype).ravel() - center) / scale
+    windows = np.lib.stride_tricks.sliding_window_view(x, window_size)
+    return windows - windows.mean(axis=1, keepdims=True)
+
+
+def overlap_mean(window_errors, n_points):
+    """Average per-element window errors back onto the points they cover"""
+    n_windows, window_size = window_errors.shape
+    total = np.zeros(n_points, dtype=np.float64)
+    counts = np.zeros(n_points, dtype=np.float64)
+    for offset in range(window_size):
+        total[offset:offset + n_windows] += window_errors[:, offset]
+        counts[offset:offset + n_windows] += 1
+    return total / counts
+
 
 class DeepAnomalyDetector:
-    """Autoencoder-based anomaly detection (simulated for demo)"""
+    """Dense autoencoder over sliding windows, in NumPy float32
+
+    Level-centred windows of the standardized series pass through a small tanh
+    bottleneck, trained with mini-batch Adam on the mean squared
+    reconstruction error and stopped early once a held-out split stops
+    improving. A point's error is the mean over every window covering it.
+    Training shuffles with a seeded generator, so fits are reproducible.
+    """
     
-    def __init__(self, threshold_percentile=95):
+    def __init__(self, threshold_percentile=95, window_size=16, hidden=(8, 4), epochs=100,
+                 batch_size=64, learning_rate=1e-3, patience=5, validation_split=0.1, seed=42):
         self.threshold_percentile = threshold_percentile
+        self.window_size = window_size
+        self.hidden = tuple(hidden)
+        self.epochs = epochs
+        self.batch_size = batch_size
+        self.learning_rate = learning_rate
+        self.patience = patience
+        self.validation_split = validation_split
+        self.seed = seed
         self.reconstruction_threshold = None
+        self.reconstruction_errors = None
+        self.weights = []
+        self.biases = []
+        self.center = 0.0
+        self.scale = 1.0
+        self.loss_history = []
+        self.fitted = False
         self.history = []
         
+    def _windows(self, X):
+        return centred_windows(X, self.window_size, self.center, self.scale, dtype=np.float32)
+    
+    def _forward(self, windows):
+        activations = [windows]
+        for layer, (W, b) in enumerate(zip(self.weights, self.biases)):
+            z = activations[-1] @ W + b
+            activations.append(np.tanh(z) if layer < len(self.weights) - 1 else z)
+        return activations
+    
+    def _point_errors(self, windows, n_points):
+        """Average each window's squared error back onto the points it covers"""
+        return overlap_mean((self._forward(windows)[-1] - windows) ** 2, n_points)
+    
     def fit(self, X):
         """Fit autoencoder on normal data"""
-        # Simulate reconstruction errors (in production, use actual autoencoder)
-        self.reconstruction_errors = np.random.exponential(0.1, len(X))
+        X = np.asarray(X, dtype=np.float64).ravel()
+        if len(X) < self.window_size + 1:
+            return False
+        rng = np.random.default_rng(self.seed)
+        self.center = np.float32(np.mean(X))
+        self.scale = np.float32(np.std(X) or 1.0)
+        windows = self._windows(X)
+        
+        # Glorot-uniform initialisation, float32 throughout
+        sizes = [self.window_size, *self.hidden, *self.hidden[-2::-1], self.window_size]
+        self.weights, self.biases = [], []
+        for fan_in, fan_out in zip(sizes[:-1], sizes[1:]):
+            limit = np.sqrt(6.0 / (fan_in + fan_out))
+            self.weights.append(rng.uniform(-limit, limit, (fan_in, fan_out)).astype(np.float32))
+            self.biases.append(np.zeros(fan_out, dtype=np.float32))
+        params = self.weights + self.biases
+        m = [np.zeros_like(p) for p in params]
+        v = [np.zeros_like(p) for p in params]
+        beta1, beta2, eps = 0.9, 0.999, 1e-7
+        
+        order = rng.permutation(len(windows))
+        n_val = int(len(windows) * self.validation_split)
+        train, val = windows[order[n_val:]], windows[order[:n_val]]
+        if n_val == 0:
+            val = train
+        
+        best_loss, best_params, stale, step = np.inf, None, 0, 0
+        self.loss_history = []
+        for _ in range(self.epochs):
+            for batch_idx in np.array_split(rng.permutation(len(train)), max(1, len(train) // self.batch_size)):
+                batch = train[batch_idx]
+                activations = self._forward(batch)
+                delta = (2.0 / batch.size) * (activations[-1] - batch)
+                grads_w, grads_b = [None] * len(self.weights), [None] * len(self.weights)
+                for layer in range(len(self.weights) - 1, -1, -1):
+                    grads_w[layer] = activations[layer].T @ delta
+                    grads_b[layer] = delta.sum(axis=0)
+                    if layer:
+                        delta = (delta @ self.weights[layer].T) * (1 - activations[layer] ** 2)
+                step += 1
+                lr = self.learning_rate * np.sqrt(1 - beta2 ** step) / (1 - beta1 ** step)
+                for i, (p, g) in enumerate(zip(params, grads_w + grads_b)):
+                    m[i] = beta1 * m[i] + (1 - beta1) * g
+                    v[i] = beta2 * v[i] + (1 - beta2) * g * g
+                    p -= (lr * m[i] / (np.sqrt(v[i]) + eps)).astype(np.float32)
+            
+            val_loss = float(np.mean((self._forward(val)[-1] - val) ** 2))
+            self.loss_history.append(val_loss)
+            if val_loss < best_loss * (1 - 1e-4):
+                best_loss, best_params, stale = val_loss, [p.copy() for p in params], 0
+            else:
+                stale += 1
+                if stale >= self.patience:
+                    break
+        
+        for p, best in zip(params, best_params or params):
+            p[...] = best
+        self.reconstruction_errors = self._point_errors(windows, len(X))
         self.reconstruction_threshold = np.percentile(
             self.reconstruction_errors, 
             self.threshold_percentile
         )
+        self.fitted = True
+        return True
         
     def detect(self, X):
         """Detect anomalies based on reconstruction error"""
-        # Simulate reconstruction error (higher for anomalies)
-        base_error = np.abs(np.diff(X, prepend=X[0])) * np.random.uniform(0.5, 1.5, len(X))
+        X = np.asarray(X, dtype=np.float64).ravel()
+        if not self.fitted or len(X) < self.window_size:
+            return np.zeros(len(X), dtype=int), np.zeros(len(X))
         
-        if self.reconstruction_threshold is None:
-            self.reconstruction_threshold = np.percentile(base_error, 95)
-            
-        anomaly_scores = base_error / (self.reconstruction_threshold + 1e-8)
+        errors = self._point_errors(self._windows(X), len(X))
+        anomaly_scores = errors / (self.reconstruction_threshold + 1e-8)
         is_anomaly = (anomaly_scores > 1.0).astype(int)
         
         return is_anomaly, np.clip(anomaly_scores, 0, 2)
 
+    def get_state(self):
+        arrays = {f'W{i}': W for i, W in enumerate(self.weights)}
+        arrays.update({f'b{i}': b for i, b in enumerate(self.biases)})
+        if self.reconstruction_errors is not None:
+            arrays['reconstruction_errors'] = self.reconstruction_errors
+        return {
+            'params': {'threshold_percentile': self.threshold_percentile, 'window_size': self.window_size,
+                       'hidden': list(self.hidden), 'epochs': self.epochs, 'batch_size': self.batch_size,
+                       'learning_rate': self.learning_rate, 'patience': self.patience,
+                       'validation_split': self.validation_split, 'seed': self.seed},
+            'meta': {'reconstruction_threshold': self.reconstruction_threshold, 'fitted': self.fitted,
+                     'center': float(self.center), 'scale': float(self.scale),
+                     'loss_history': self.loss_history},
+            'arrays': arrays
+        }
+
+    def set_state(self, state):
+        meta, arrays = state['meta'], state['arrays']
+        self.reconstruction_threshold = meta['reconstruction_threshold']
+        self.fitted = meta.get('fitted', False)
+        self.center = np.float32(meta.get('center', 0.0))
+        self.scale = np.float32(meta.get('scale', 1.0))
+        self.loss_history = list(meta.get('loss_history', []))
+        n_layers = sum(1 for key in arrays if key.startswith('W'))
+        self.weights = [np.array(arrays[f'W{i}']) for i in range(n_layers)]
+        self.biases = [np.array(arrays[f'b{i}']) for i in range(n_layers)]
+        self.reconstruction_errors = arrays.get('reconstruction_errors')
+
+
+class PCAReconstructionDetector:
+    """Reconstruction error of sliding windows under a low-rank PCA basis
+
+    A lighter, deterministic alternative to the autoencoder: windows are
+    prepared the same way (standardized, level-centred) and projected onto
+    the top principal components. The basis is learned with IncrementalPCA,
+    so partial_fit on a new batch is a rank-k update instead of a new SVD.
+    The residual projector I - C^T C is cached after every update, so
+    scoring a batch takes a single matrix product; a point's error is the
+    mean squared residual over every window covering it.
+    """
+
+    def __init__(self, window_size=16, n_components=4, threshold_percentile=95, batch_size=None):
+        self.window_size = window_size
+        self.n_components = n_components
+        self.threshold_percentile = threshold_percentile
+        self.batch_size = batch_size
+        self.pca = None
+        self.center = 0.0
+        self.scale = 1.0
+        self.reconstruction_threshold = None
+        self._context = np.zeros(0)
+        self.fitted = False
+
+    def _windows(self, x):
+        return centred_windows(x, self.window_size, self.center, self.scale)
+
+    def _update_projector(self):
+        components = self.pca.components_
+        self._projector = np.eye(self.window_size) - components.T @ components
+
+    def _point_errors(self, windows, n_points):
+        """Average each window's squared residual back onto the points it covers"""
+        return overlap_mean(((windows - self.pca.mean_) @ self._projector) ** 2, n_points)
+
+    def fit(self, X):
+        """Learn the basis from scratch"""
+        X = np.asarray(X, dtype=np.float64).ravel()
+        if len(X) < self.window_size + self.n_components:
+            return False
+        self.center = float(np.mean(X))
+        self.scale = float(np.std(X) or 1.0)
+        self.pca = IncrementalPCA(n_components=self.n_components, batch_size=self.batch_size)
+        windows = self._windows(X)
+        self.pca.fit(windows)
+        self._update_projector()
+        self.reconstruction_threshold = np.percentile(
+            self._point_errors(windows, len(X)), self.threshold_percentile
+        )
+        self._context = X[-(self.window_size - 1):]
+        self.fitted = True
+        return True
+
+    def partial_fit(self, X):
+        """Update the basis (and threshold) with a new batch of the series"""
+        X = np.asarray(X, dtype=np.float64).ravel()
+        if not self.fitted:
+            return self.fit(X)
+        x = np.concatenate([self._context, X])
+        windows = self._windows(x)
+        if len(windows) < self.n_components:
+            return False
+        self.pca.partial_fit(windows)
+        self._update_projector()
+        point_errors = self._point_errors(windows, len(x))[len(self._context):]
+        self.reconstruction_threshold = np.percentile(point_errors, self.threshold_percentile)
+        self._context = x[-(self.window_size - 1):]
+        return True
+
+    def detect(self, X):
+        """Detect anomalies based on reconstruction error"""
+        X = np.asarray(X, dtype=np.float64).ravel()
+        if not self.fitted or len(X) < self.window_size:
+            return np.zeros(len(X), dtype=int), np.zeros(len(X))
+        errors = self._point_errors(self._windows(X), len(X))
+        anomaly_scores = errors / (self.reconstruction_threshold + 1e-12)
+        return (anomaly_scores > 1.0).astype(int), np.clip(anomaly_scores, 0, 2)
+
+    def get_state(self):
+        return {
+            'params': {'window_size': self.window_size, 'n_components': self.n_components,
+                       'threshold_percentile': self.threshold_percentile, 'batch_size': self.batch_size},
+            'meta': {'fitted': self.fitted, 'center': self.center, 'scale': self.scale,
+                     'reconstruction_threshold': self.reconstruction_threshold},
+            'arrays': {'context': self._context},
+            'objects': {'pca': self.pca}
+        }
+
+    def set_state(self, state):
+        meta = state['meta']
+        self.fitted = meta['fitted']
+        self.center = meta['center']
+        self.scale = meta['scale']
+        self.reconstruction_threshold = meta['reconstruction_threshold']
+        self._context = np.array(state['arrays']['context'])
+        self.pca = state['objects']['pca']
+        if self.fitted:
+            self._update_projector()
+
+
+# Relative weight of each score in the fused ensemble; the four ML models share
+# the ML ensemble's weight
+FUSION_WEIGHTS = {
+    'statistical': 0.3,
+    'isolation_forest': 0.075, 'elliptic_envelope': 0.075, 'lof': 0.075, 'one_class_svm': 0.075,
+    'deep': 0.25,
+    'change_point': 0.15,
+}
+
+
+class ScoreCalibrator:
+    """Fuse detector scores on a common scale through empirical-CDF tables
+
+    fit() stores a compact quantile table of each detector's reference scores.
+    A raw score then becomes its mid-rank percentile with one searchsorted, so
+    detectors on unrelated scales can be averaged; the weighted average is
+    mapped through its own table, and points above 1 - contamination are
+    flagged. Tables are small, so scalar calls are cheap enough per tick.
+    """
+    
+    def __init__(self, contamination=0.1, n_quantiles=512, weights=None):
+        self.contamination = contamination
+        self.n_quantiles = n_quantiles
+        self.weights = dict(FUSION_WEIGHTS if weights is None else weights)
+        self.tables = {}
+        self.fitted = False
+        
+    def _table(self, scores):
+        scores = np.asarray(scores, dtype=float).ravel()
+        scores = scores[np.isfinite(scores)]
+        if len(scores) <= self.n_quantiles:
+            return np.sort(scores)
+        return np.quantile(scores, np.linspace(0.0, 1.0, self.n_quantiles))
+    
+    def _percentile(self, table, scores):
+        # Mid-rank so a tied block (e.g. many zero scores) lands in its middle
+        left = np.searchsorted(table, scores, side='left')
+        right = np.searchsorted(table, scores, side='right')
+        return (left + right) / (2.0 * len(table))
+    
+    def fit(self, reference_scores):
+        """Build the lookup tables from a dict of reference scores per detector"""
+        self.tables = {
+            name: self._table(scores) for name, scores in reference_scores.items()
+            if name in self.weights and len(np.ravel(scores)) > 0
+        }
+        self.fitted = bool(self.tables)
+        if self.fitted:
+            self.tables['fused'] = self._table(self._combine(reference_scores))
+        return self
+    
+    def percentiles(self, name, scores):
+        """Calibrated percentile in [0, 1] of raw scores from one detector"""
+        return self._percentile(self.tables[name], scores)
+    
+    def _combine(self, scores):
+        total, weight = 0.0, 0.0
+        for name, w in self.weights.items():
+            if name not in self.tables or name not in scores:
+                continue
+            total = total + w * self._percentile(self.tables[name], scores[name])
+            weight += w
+        return total / weight if weight else total
+    
+    def fuse(self, scores):
+        """Fused ensemble percentile from a dict of raw scores per detector"""
+        return self._percentile(self.tables['fused'], self._combine(scores))
+    
+    def detect(self, scores):
+        """Flag points whose fused percentile exceeds 1 - contamination"""
+        fused = self.fuse(scores)
+        return (fused > 1.0 - self.contamination).astype(int), fused
+    
+    def get_state(self):
+        return {
+            'params': {'contamination': self.contamination, 'n_quantiles': self.n_quantiles,
+                       'weights': self.weights},
+            'meta': {'fitted': self.fitted},
+            'arrays': dict(self.tables)
+        }
+    
+    def set_state(self, state):
+        self.fitted = state['meta']['fitted']
+        self.tables = {name: np.asarray(table) for name, table in state['arrays'].items()}
+
+
+@lru_cache(maxsize=4096)
+def ks_pvalue(statistic, effective_n):
+    """Asymptotic two-sided KS p-value (as stats.ks_2samp with method='asymp')
+
+    The statistic only takes a handful of distinct values for fixed sample
+    sizes, so repeated drift checks are answered from the cache.
+    """
+    return float(stats.kstwo.sf(statistic, effective_n))
+
+
+def ks_statistic(reference_sorted, current):
+    """Two-sample KS statistic against a pre-sorted reference in O(m log n)
+
+    Both ECDFs are step functions, so the supremum of their difference is
+    reached at (or just before) a point of the current sample; evaluating
+    the reference ECDF there takes one searchsorted per side.
+    """
+    current = np.sort(current)
+    n_ref, n_cur = len(reference_sorted), len(current)
+    above = (np.searchsorted(current, current, side='right') / n_cur
+             - np.searchsorted(reference_sorted, current, side='right') / n_ref)
+    below = (np.searchsorted(reference_sorted, current, side='left') / n_ref
+             - np.searchsorted(current, current, side='left') / n_cur)
+    return float(max(above.max(), below.max(), 0.0))
+
+
+class DriftHistory:
+    """Fixed-memory drift check history with minute and hour rollups
+
+    The latest checks live in a ring buffer of (timestamp, score, detected)
+    records. A record pushed out of the ring is folded into its minute
+    bucket (min/max/mean score, count, flagged count); minute buckets pushed
+    out of their ring fold into hour buckets, and the oldest hours are
+    dropped. Memory is fixed by the three capacities, while the default
+    hour ring still covers four weeks.
+    """
+
+    RAW_DTYPE = np.dtype([('timestamp', 'datetime64[us]'), ('score', 'f8'), ('detected', '?')])
+    ROLLUP_DTYPE = np.dtype([('timestamp', 'datetime64[us]'), ('min', 'f8'), ('max', 'f8'),
+                             ('mean', 'f8'), ('count', 'i8'), ('detected', 'i8')])
+    LEVELS = ('raw', 'minute', 'hour')
+
+    def __init__(self, capacity=1000, minute_capacity=1440, hour_capacity=672):
+        self.capacity = capacity
+        self.minute_capacity = minute_capacity
+        self.hour_capacity = hour_capacity
+        self._buffers = {
+            'raw': np.zeros(capacity, dtype=self.RAW_DTYPE),
+            'minute': np.zeros(minute_capacity, dtype=self.ROLLUP_DTYPE),
+            'hour': np.zeros(hour_capacity, dtype=self.ROLLUP_DTYPE)
+        }
+        self._start = dict.fromkeys(self.LEVELS, 0)
+        self._size = dict.fromkeys(self.LEVELS, 0)
+
+    def __len__(self):
+        return self._size['raw']
+
+    def _ordered(self, level):
+        buffer = self._buffers[level]
+        return buffer[(self._start[level] + np.arange(self._size[level])) % len(buffer)]
+
+    def _push(self, level, record):
+        """Append to a ring; return the record it overwrote, if any"""
+        buffer = self._buffers[level]
+        if len(buffer) == 0:
+            return record
+        if self._size[level] < len(buffer):
+            buffer[(self._start[level] + self._size[level]) % len(buffer)] = record
+            self._size[level] += 1
+            return None
+        evicted = buffer[self._start[level]].copy()
+        buffer[self._start[level]] = record
+        self._start[level] = (self._start[level] + 1) % len(buffer)
+        return evicted
+
+    def _roll(self, level, timestamp, low, high, mean, count, detected):
+        unit = 'm' if level == 'minute' else 'h'
+        bucket = np.datetime64(timestamp, unit).astype('datetime64[us]')
+        buffer = self._buffers[level]
+        if self._size[level]:
+            last = (self._start[level] + self._size[level] - 1) % len(buffer)
+            if buffer['timestamp'][last] == bucket:
+                total = buffer['count'][last] + count
+                buffer['mean'][last] = (buffer['mean'][last] * buffer['count'][last] + mean * count) / total
+                buffer['min'][last] = min(buffer['min'][last], low)
+                buffer['max'][last] = max(buffer['max'][last], high)
+                buffer['count'][last] = total
+                buffer['detected'][last] += detected
+                return
+        evicted = self._push(level, (bucket, low, high, mean, count, detected))
+        if evicted is not None and level == 'minute':
+            self._roll('hour', evicted['timestamp'], evicted['min'], evicted['max'],
+                       evicted['mean'], evicted['count'], evicted['detected'])
+
+    def append(self, timestamp, score, detected):
+        """Record one drift check"""
+        evicted = self._push('raw', (np.datetime64(timestamp, 'us'), score, detected))
+        if evicted is not None:
+            self._roll('minute', evicted['timestamp'], evicted['score'], evicted['score'],
+                       evicted['score'], 1, int(evicted['detected']))
+
+    def records(self):
+        """Raw checks still in the ring, oldest first"""
+        return self._ordered('raw')
+
+    def rollups(self, level):
+        """'minute' or 'hour' buckets, oldest first"""
+        return self._ordered(level)
+
+    def timeline(self):
+        """Hour means, then minute means, then raw checks, as chartable arrays"""
+        hours, minutes, raw = self._ordered('hour'), self._ordered('minute'), self._ordered('raw')
+        return {
+            'timestamp': np.concatenate([hours['timestamp'], minutes['timestamp'], raw['timestamp']]),
+            'score': np.concatenate([hours['mean'], minutes['mean'], raw['score']]),
+            'detected': np.concatenate([hours['detected'] > 0, minutes['detected'] > 0, raw['detected']])
+        }
+
+    def get_state(self):
+        return {
+            'params': {'capacity': self.capacity, 'minute_capacity': self.minute_capacity,
+                       'hour_capacity': self.hour_capacity},
+            'arrays': {level: self._ordered(level) for level in self.LEVELS}
+        }
+
+    def set_state(self, state):
+        for level in self.LEVELS:
+            records = np.asarray(state['arrays'][level])[-len(self._buffers[level]):]
+            self._buffers[level][:len(records)] = records
+            self._start[level] = 0
+            self._size[level] = len(records)
+
 
 class ModelDriftDetector:
     """Detect drift in model inputs and predictions"""
     
-    def __init__(self, reference_window=500, detection_window=50, drift_threshold=0.1):
+    BINNINGS = ('fixed', 'quantile')
+    
+    def __init__(self, reference_window=500, detection_window=50, drift_threshold=0.1,
+                 binning='fixed', buckets=10):
+        if binning not in self.BINNINGS:
+            raise ValueError(f"binning must be one of {self.BINNINGS}, got {binning!r}")
         self.reference_window = reference_window
         self.detection_window = detection_window
         self.drift_threshold = drift_threshold
+        self.binning = binning
+        self.buckets = buckets
         self.reference_data = None
-        self.drift_history = []
+        self.reference_sorted = None
+        self.drift_history = DriftHistory()
         
     def set_reference(self, data):
         """Set reference distribution"""
         self.reference_data = np.array(data[-self.reference_window:])
+        # Sorted once here so every KS check is a searchsorted against it
+        self.reference_sorted = np.sort(self.reference_data)
         self.reference_stats = {
             'mean': np.mean(self.reference_data),
             'std': np.std(self.reference_data),
@@ -1298,6 +4158,44 @@ class ModelDriftDetector:
             'q25': np.percentile(self.reference_data, 25),
             'q75': np.percentile(self.reference_data, 75)
         }
+        self._freeze_bins()
+    
+    def _freeze_bins(self):
+        """Bin edges, counts and log-probabilities of the reference, computed once
+
+        'fixed' uses equal-width bins over the reference range (as
+        np.histogram), 'quantile' uses reference quantiles so every bin
+        starts with a similar share of the data.
+        """
+        if self.binning == 'quantile':
+            edges = np.unique(np.quantile(self.reference_sorted, np.linspace(0, 1, self.buckets + 1)))
+            if len(edges) < 2:
+                edges = np.histogram_bin_edges(self.reference_sorted, bins=1)
+        else:
+            edges = np.histogram_bin_edges(self.reference_sorted, bins=self.buckets)
+        self.bin_edges = edges
+        self.reference_counts = self._bin_counts(self.reference_sorted)
+        ref_pct = self.reference_counts / len(self.reference_sorted)
+        self._reference_pct = np.where(ref_pct == 0, 1e-10, ref_pct)
+        self._reference_log_pct = np.log(self._reference_pct)
+        ref_prob = ref_pct + 1e-10
+        self._reference_prob = ref_prob / ref_prob.sum()
+        self._reference_log_prob = np.log(self._reference_prob)
+    
+    def _bin_counts(self, values, clip=False):
+        """Counts per frozen bin: half-open bins, last one closed (np.histogram rules)
+
+        Values outside the reference range are dropped, or with clip=True
+        counted in the outermost bins.
+        """
+        n_bins = len(self.bin_edges) - 1
+        idx = np.searchsorted(self.bin_edges, values, side='right') - 1
+        idx[values == self.bin_edges[-1]] = n_bins - 1
+        if clip:
+            idx = np.clip(idx, 0, n_bins - 1)
+        else:
+            idx = idx[(idx >= 0) & (idx < n_bins)]
+        return np.bincount(idx, minlength=n_bins)
         
     def detect_drift(self, current_data):
         """Detect if current data has drifted from reference"""
@@ -1307,13 +4205,15 @@ class ModelDriftDetector:
         current = np.array(current_data[-self.detection_window:])
         
         # Kolmogorov-Smirnov test
-        ks_stat, ks_pvalue = stats.ks_2samp(self.reference_data, current)
+        ks_stat = ks_statistic(self.reference_sorted, current)
+        n_large, n_small = max(len(self.reference_sorted), len(current)), min(len(self.reference_sorted), len(current))
+        ks_pval = ks_pvalue(ks_stat, round(n_large * n_small / (n_large + n_small)))
         
         # Population Stability Index
-        psi = self._calculate_psi(self.reference_data, current)
+        psi = self._calculate_psi(current)
         
         # Jensen-Shannon divergence (approximated)
-        js_divergence = self._calculate_js_divergence(self.reference_data, current)
+        js_divergence = self._calculate_js_divergence(current)
         
         # Mean shift detection
         mean_shift = abs(np.mean(current) - self.reference_stats['mean']) / (self.reference_stats['std'] + 1e-8)
@@ -1323,19 +4223,13 @@ class ModelDriftDetector:
         variance_drift = abs(np.log(var_ratio))
         
         # Combined drift score
-        drift_score = (
-            0.25 * ks_stat +
-            0.25 * min(psi / 0.25, 1.0) +
-            0.20 * min(js_divergence, 1.0) +
-            0.15 * min(mean_shift / 3, 1.0) +
-            0.15 * min(variance_drift / 2, 1.0)
-        )
+        drift_score = float(self._drift_score(ks_stat, psi, js_divergence, mean_shift, variance_drift))
         
         drift_detected = drift_score > self.drift_threshold
         
         details = {
             'ks_statistic': ks_stat,
-            'ks_pvalue': ks_pvalue,
+            'ks_pvalue': ks_pval,
             'psi': psi,
             'js_divergence': js_divergence,
             'mean_shift': mean_shift,
@@ -1344,49 +4238,169 @@ class ModelDriftDetector:
             'reference_mean': self.reference_stats['mean']
         }
         
-        self.drift_history.append({
-            'timestamp': datetime.now(),
-            'score': drift_score,
-            'detected': drift_detected
-        })
+        self.drift_history.append(datetime.now(), drift_score, drift_detected)
         
         return drift_detected, drift_score, details
+    
+    @staticmethod
+    def _drift_score(ks_stat, psi, js_divergence, mean_shift, variance_drift):
+        """Weighted combination of the drift measures (scalars or arrays)"""
+        return (
+            0.25 * ks_stat +
+            0.25 * np.minimum(psi / 0.25, 1.0) +
+            0.20 * np.minimum(js_divergence, 1.0) +
+            0.15 * np.minimum(mean_shift / 3, 1.0) +
+            0.15 * np.minimum(variance_drift / 2, 1.0)
+        )
+    
+    def drift_timeline(self, values, step=1, chunk_size=4096):
+        """Drift measures for every sliding detection window of values at once
+
+        Window k covers values[k*step : k*step + detection_window], and each
+        array in the result holds one entry per window (end is the index of
+        the window's last point). Means and variances come from cumulative
+        sums, PSI/JS bin counts from each bin's point positions, and KS from
+        windows sorted a chunk at a time and ranked against the sorted
+        reference with searchsorted; nothing is recomputed per window in
+        Python. Values match detect_drift() on the same window.
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        w = self.detection_window
+        if self.reference_data is None or len(values) < max(w, 10):
+            return {key: np.zeros(0) for key in
+                    ('end', 'ks_statistic', 'psi', 'js_divergence', 'mean_shift', 'variance_drift', 'score', 'detected')}
+        starts = np.arange(0, len(values) - w + 1, step)
         
-    def _calculate_psi(self, reference, current, buckets=10):
-        """Calculate Population Stability Index"""
-        try:
-            _, bin_edges = np.histogram(reference, bins=buckets)
-            ref_counts, _ = np.histogram(reference, bins=bin_edges)
-            curr_counts, _ = np.histogram(current, bins=bin_edges)
-            
-            ref_pct = ref_counts / len(reference)
-            curr_pct = curr_counts / len(current)
-            
-            # Avoid division by zero
-            ref_pct = np.where(ref_pct == 0, 1e-10, ref_pct)
-            curr_pct = np.where(curr_pct == 0, 1e-10, curr_pct)
-            
-            psi = np.sum((curr_pct - ref_pct) * np.log(curr_pct / ref_pct))
-            return abs(psi)
-        except Exception:
-            return 0.0
-            
-    def _calculate_js_divergence(self, p, q, buckets=10):
-        """Calculate Jensen-Shannon divergence"""
-        try:
-            _, bin_edges = np.histogram(np.concatenate([p, q]), bins=buckets)
-            p_hist, _ = np.histogram(p, bins=bin_edges, density=True)
-            q_hist, _ = np.histogram(q, bins=bin_edges, density=True)
-            
-            p_hist = p_hist + 1e-10
-            q_hist = q_hist + 1e-10
-            
-            m = 0.5 * (p_hist + q_hist)
+        # Means and variances from cumulative sums (shifted for precision)
+        shift = self.reference_stats['mean']
+        centred = values - shift
+        csum = np.concatenate([[0.0], np.cumsum(centred)])
+        csq = np.concatenate([[0.0], np.cumsum(centred * centred)])
+        window_mean = (csum[starts + w] - csum[starts]) / w
+        window_var = np.maximum((csq[starts + w] - csq[starts]) / w - window_mean ** 2, 0.0)
+        mean_shift = np.abs(window_mean) / (self.reference_stats['std'] + 1e-8)
+        with np.errstate(divide='ignore'):
+            variance_drift = np.abs(np.log(window_var / (np.var(self.reference_data) + 1e-8)))
+        
+        # Frozen-bin counts per window: each bin's sorted point positions,
+        # searched at the window bounds (O(n) memory, work only for requested windows)
+        n_bins = len(self.bin_edges) - 1
+        idx = np.searchsorted(self.bin_edges, values, side='right') - 1
+        idx[values == self.bin_edges[-1]] = n_bins - 1
+        # Out-of-range values go to two extra columns: below, then above the range
+        idx = np.where(idx < 0, n_bins, np.where(idx >= n_bins, n_bins + 1, idx))
+        counts = np.empty((len(starts), n_bins + 2), dtype=np.int64)
+        for b in range(n_bins + 2):
+            positions = np.flatnonzero(idx == b)
+            counts[:, b] = np.searchsorted(positions, starts + w) - np.searchsorted(positions, starts)
+        
+        curr_pct = counts[:, :n_bins] / w
+        curr_pct = np.where(curr_pct == 0, 1e-10, curr_pct)
+        psi = np.abs(np.sum((curr_pct - self._reference_pct) * (np.log(curr_pct) - self._reference_log_pct), axis=1))
+        
+        # JS counts out-of-range values in the outermost bins
+        clipped = counts[:, :n_bins].copy()
+        clipped[:, 0] += counts[:, n_bins]
+        clipped[:, -1] += counts[:, n_bins + 1]
+        q = clipped / w + 1e-10
+        q = q / q.sum(axis=1, keepdims=True)
+        p = self._reference_prob
+        log_m = np.log(0.5 * (p + q))
+        js_divergence = (0.5 * np.sum(p * (self._reference_log_prob - log_m), axis=1)
+                         + 0.5 * np.sum(q * (np.log(q) - log_m), axis=1))
+        
+        # KS: sort windows a chunk at a time, rank them against the reference
+        ref = self.reference_sorted
+        n_ref = len(ref)
+        windows = np.lib.stride_tricks.sliding_window_view(values, w)[starts]
+        positions = np.arange(w)
+        ks_stat = np.empty(len(starts))
+        for lo in range(0, len(starts), chunk_size):
+            chunk = np.sort(windows[lo:lo + chunk_size], axis=1)
+            new_value = chunk[:, 1:] != chunk[:, :-1]
+            ones = np.ones((len(chunk), 1), dtype=bool)
+            # Within-window ranks of tied values: first and last index of each run
+            first = np.maximum.accumulate(np.where(np.hstack([ones, new_value]), positions, 0), axis=1)
+            last = np.minimum.accumulate(np.where(np.hstack([new_value, ones]), positions, w)[:, ::-1], axis=1)[:, ::-1]
+            ref_right = np.searchsorted(ref, chunk.ravel(), side='right').reshape(chunk.shape)
+            ref_left = np.searchsorted(ref, chunk.ravel(), side='left').reshape(chunk.shape)
+            above = ((last + 1) / w - ref_right / n_ref).max(axis=1)
+            below = (ref_left / n_ref - first / w).max(axis=1)
+            ks_stat[lo:lo + chunk_size] = np.maximum(np.maximum(above, below), 0.0)
+        
+        score = self._drift_score(ks_stat, psi, js_divergence, mean_shift, variance_drift)
+        return {
+            'end': starts + w - 1,
+            'ks_statistic': ks_stat,
+            'psi': psi,
+            'js_divergence': js_divergence,
+            'mean_shift': mean_shift,
+            'variance_drift': variance_drift,
+            'score': score,
+            'detected': score > self.drift_threshold
+        }
+        
+    def _calculate_psi(self, current):
+        """Calculate Population Stability Index on the frozen reference bins"""
+        curr_pct = self._bin_counts(current) / len(current)
+        
+        # Avoid division by zero
+        curr_pct = np.where(curr_pct == 0, 1e-10, curr_pct)
+        
+        psi = np.sum((curr_pct - self._reference_pct) * (np.log(curr_pct) - self._reference_log_pct))
+        return abs(psi)
             
-            js = 0.5 * stats.entropy(p_hist, m) + 0.5 * stats.entropy(q_hist, m)
-            return js
-        except Exception:
-            return 0.0
+    def _calculate_js_divergence(self, current):
+        """Calculate Jensen-Shannon divergence on the frozen reference bins"""
+        q = self._bin_counts(current, clip=True) / len(current) + 1e-10
+        q = q / q.sum()
+        p = self._reference_prob
+        
+        log_m = np.log(0.5 * (p + q))
+        js = 0.5 * np.sum(p * (self._reference_log_prob - log_m)) + 0.5 * np.sum(q * (np.log(q) - log_m))
+        return js
+
+    def get_state(self, history=True):
+        """Checkpoint state: the reference sample and (optionally) the drift history"""
+        arrays = {}
+        meta = {}
+        if history:
+            history_state = self.drift_history.get_state()
+            meta['history_params'] = history_state['params']
+            arrays.update({f'history_{level}': records for level, records in history_state['arrays'].items()})
+        if self.reference_data is not None:
+            arrays['reference_data'] = self.reference_data
+            meta['reference_stats'] = self.reference_stats
+        return {
+            'params': {
+                'reference_window': self.reference_window,
+                'detection_window': self.detection_window,
+                'drift_threshold': self.drift_threshold,
+                'binning': self.binning,
+                'buckets': self.buckets
+            },
+            'meta': meta,
+            'arrays': arrays
+        }
+
+    def set_state(self, state):
+        arrays = state['arrays']
+        if 'reference_data' in arrays:
+            self.reference_data = np.array(arrays['reference_data'])
+            self.reference_sorted = np.sort(self.reference_data)
+            self.reference_stats = dict(state['meta']['reference_stats'])
+            self._freeze_bins()
+        if 'history_raw' in arrays:
+            self.drift_history = DriftHistory(**state['meta'].get('history_params', {}))
+            self.drift_history.set_state({'arrays': {
+                level: arrays[f'history_{level}'] for level in DriftHistory.LEVELS
+            }})
+        elif 'history_score' in arrays:
+            # Checkpoints written before the ring buffer stored flat history arrays
+            self.drift_history = DriftHistory()
+            for ts, score, detected in zip(arrays['history_timestamp'], arrays['history_score'],
+                                           arrays['history_detected']):
+                self.drift_history.append(ts, score, detected)
 
 
 class MarketRegimeDetector:
@@ -1462,6 +4476,18 @@ class MarketRegimeDetector:
             'probabilities': probabilities.tolist()
         }
 
+    def get_state(self):
+        return {
+            'params': {'n_regimes': self.n_regimes},
+            'meta': {'fitted': self.fitted},
+            'objects': {'gmm': self.gmm, 'scaler': self.scaler}
+        }
+
+    def set_state(self, state):
+        self.fitted = state['meta']['fitted']
+        self.gmm = state['objects']['gmm']
+        self.scaler = state['objects']['scaler']
+
 
 class AnomalyAlertManager:
     """Manage and display anomaly alerts"""
@@ -1494,10 +4520,196 @@ class AnomalyAlertManager:
         return dict(self.alert_counts)
 
 
+# ============================================================================
+# DETECTOR CHECKPOINTS
+# ============================================================================
+
+# Bump when the on-disk layout changes; older checkpoints stay loadable
+CHECKPOINT_VERSION = 1
+CHECKPOINT_DIR = os.environ.get('ANOMALY_CHECKPOINT_DIR', '.checkpoints')
+CHECKPOINT_SESSION_KEYS = ('stat_detector', 'cusum_detector', 'ph_detector', 'ml_detector', 'hst_detector', 'mp_detector', 'deep_detector', 'pca_detector',
+                           'drift_detector', 'regime_detector', 'score_calibrator')
+
+
+def _checkpoint_classes():
+    return {cls.__name__: cls for cls in (
+        StatisticalAnomalyDetector, EWMAAnomalyDetector, CUSUMDetector, PageHinkleyDetector,
+        DetectorBank, MLAnomalyDetector, HalfSpaceTrees, MatrixProfileDetector,
+        DeepAnomalyDetector, PCAReconstructionDetector, ScoreCalibrator, ModelDriftDetector, MarketRegimeDetector
+    )}
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot serialise {type(value).__name__} in checkpoint metadata")
+
+
+def save_checkpoint(path, detectors):
+    """Write named detectors to a checkpoint directory
+
+    Layout: manifest.json (format version, class, constructor params and
+    small metadata per detector), one .npy file per state array, and a
+    joblib file for fitted estimators. The directory is written next to
+    path and swapped in, so a failed save never leaves a partial checkpoint.
+    """
+    staging = f"{path}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    manifest = {
+        'format': 'anomaly-detector-checkpoint',
+        'version': CHECKPOINT_VERSION,
+        'created': datetime.now().isoformat(),
+        'detectors': {}
+    }
+    try:
+        for name, detector in detectors.items():
+            state = detector.get_state()
+            arrays = state.get('arrays', {})
+            objects = state.get('objects', {})
+            for key, array in arrays.items():
+                np.save(os.path.join(staging, f"{name}.{key}.npy"), np.asarray(array), allow_pickle=False)
+            if objects:
+                joblib.dump(objects, os.path.join(staging, f"{name}.joblib"))
+            manifest['detectors'][name] = {
+                'class': type(detector).__name__,
+                'params': state['params'],
+                'meta': state.get('meta', {}),
+                'arrays': sorted(arrays),
+                'objects': bool(objects)
+            }
+
+        with open(os.path.join(staging, 'manifest.json'), 'w') as fh:
+            json.dump(manifest, fh, indent=2, default=_json_default)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(staging, path)
+    return manifest
+
+
+def load_checkpoint(path, mmap_mode='c'):
+    """Rebuild the detectors saved by save_checkpoint
+
+    Arrays are memory-mapped (copy-on-write by default), so restoring a large
+    window or reference sample costs page faults rather than reads.
+    """
+    with open(os.path.join(path, 'manifest.json')) as fh:
+        manifest = json.load(fh)
+    if manifest.get('format') != 'anomaly-detector-checkpoint':
+        raise ValueError(f"{path} is not a detector checkpoint")
+    if manifest.get('version', 0) > CHECKPOINT_VERSION:
+        raise ValueError(
+            f"Checkpoint version {manifest['version']} is newer than supported ({CHECKPOINT_VERSION})"
+        )
+
+    classes = _checkpoint_classes()
+    detectors = {}
+    for name, entry in manifest['detectors'].items():
+        arrays = {
+            key: np.load(os.path.join(path, f"{name}.{key}.npy"), mmap_mode=mmap_mode, allow_pickle=False)
+            for key in entry['arrays']
+        }
+        objects = {}
+        if entry['objects']:
+            objects = joblib.load(os.path.join(path, f"{name}.joblib"), mmap_mode=mmap_mode)
+        detector = classes[entry['class']](**entry['params'])
+        detector.set_state({'meta': entry['meta'], 'arrays': arrays, 'objects': objects})
+        detectors[name] = detector
+    return detectors
+
+
 # ============================================================================
 # DATA SIMULATION
 # ============================================================================
 
+# ============================================================================
+# FITTED-MODEL CACHE
+# ============================================================================
+
+MODEL_CACHE_DIR = os.environ.get('ANOMALY_MODEL_CACHE_DIR')
+
+
+def data_fingerprint(data, **params):
+    """Fast content hash of an array plus the parameters it was fitted with"""
+    data = np.ascontiguousarray(data)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{data.dtype.str}{data.shape}".encode())
+    digest.update(data.view(np.uint8).reshape(-1))
+    digest.update(json.dumps(params, sort_keys=True, default=_json_default).encode())
+    return digest.hexdigest()
+
+
+class ModelCache:
+    """LRU cache of fitted detector state, keyed by training data and parameters
+
+    Entries are the detectors' own get_state() dicts, so a hit is restored
+    with set_state() instead of refitting. With disk_dir set, entries are
+    also written there with joblib and survive restarts.
+    """
+
+    # Settings that change how a fit runs but not what it produces; they
+    # stay out of the key so e.g. a thread and a process fit share an entry
+    EXECUTION_PARAMS = ('n_jobs', 'backend')
+
+    def __init__(self, max_entries=16, disk_dir=None):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.joblib")
+
+    def get(self, key):
+        """Return a copy of the cached state for key, or None"""
+        state = self.entries.get(key)
+        if state is not None:
+            self.entries.move_to_end(key)
+        elif self.disk_dir and os.path.exists(self._disk_path(key)):
+            state = joblib.load(self._disk_path(key))
+            self._remember(key, state)
+        if state is None:
+            return None
+        # Detectors refit their estimators in place, so never hand out the cached objects
+        return copy.deepcopy(state)
+
+    def put(self, key, state):
+        state = copy.deepcopy(state)
+        self._remember(key, state)
+        if self.disk_dir:
+            joblib.dump(state, self._disk_path(key))
+
+    def _remember(self, key, state):
+        self.entries[key] = state
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def fit(self, detector, method, data, state_kwargs=None):
+        """Call detector.<method>(data), or restore its result from the cache"""
+        state_kwargs = state_kwargs or {}
+        params = {name: value for name, value in detector.get_state(**state_kwargs)['params'].items()
+                  if name not in self.EXECUTION_PARAMS}
+        key = data_fingerprint(data, detector=type(detector).__name__, method=method, **params)
+        state = self.get(key)
+        if state is not None:
+            self.hits += 1
+            detector.set_state(state)
+            return True
+        self.misses += 1
+        result = getattr(detector, method)(data)
+        if result is not False:
+            self.put(key, detector.get_state(**state_kwargs))
+        return result
+
+
 def generate_synthetic_data(n_points=500, with_anomalies=True, anomaly_rate=0.05):
     """Generate synthetic time series data with injected anomalies"""
     np.random.seed(int(time.time()) % 1000)
@@ -1690,9 +4902,13 @@ def create_time_series_chart(df, anomaly_scores, detected_anomalies, title="Time
 
 
 def create_drift_chart(drift_history, title="Model Drift Over Time"):
-    """Create drift monitoring chart"""
+    """Create drift monitoring chart
+
+    drift_history maps 'timestamp', 'score' and 'detected' to equal-length
+    arrays (a drift timeline or DriftHistory.timeline()).
+    """
     
-    if not drift_history:
+    if len(drift_history['score']) == 0:
         fig = go.Figure()
         fig.add_annotation(
             text="No drift data available",
@@ -1701,9 +4917,9 @@ def create_drift_chart(drift_history, title="Model Drift Over Time"):
             font=dict(size=16, color='gray')
         )
     else:
-        timestamps = [d['timestamp'] for d in drift_history]
-        scores = [d['score'] for d in drift_history]
-        detected = [d['detected'] for d in drift_history]
+        timestamps = drift_history['timestamp']
+        scores = drift_history['score']
+        detected = drift_history['detected']
         
         fig = go.Figure()
         
@@ -1714,7 +4930,7 @@ def create_drift_chart(drift_history, title="Model Drift Over Time"):
             name='Drift Score',
             line=dict(color='#aa66ff', width=2),
             marker=dict(
-                size=8,
+                size=8 if len(scores) <= 200 else 3,
                 color=['#ff3366' if d else '#00ff88' for d in detected],
                 line=dict(color='white', width=1)
             ),
@@ -1912,11 +5128,17 @@ def format_timedelta(delta):
     return " ".join(parts[:2])
 
 
-def reset_detectors(z_threshold, contamination, drift_threshold):
+def reset_detectors(z_threshold, contamination, drift_threshold, svm_backend='exact'):
     """Recreate detector objects with updated configuration"""
     st.session_state.stat_detector = StatisticalAnomalyDetector(z_threshold=z_threshold)
-    st.session_state.ml_detector = MLAnomalyDetector(contamination=contamination)
+    st.session_state.cusum_detector = CUSUMDetector()
+    st.session_state.ph_detector = PageHinkleyDetector()
+    st.session_state.ml_detector = MLAnomalyDetector(contamination=contamination, svm_backend=svm_backend)
+    st.session_state.hst_detector = HalfSpaceTrees(contamination=contamination)
+    st.session_state.score_calibrator = ScoreCalibrator(contamination=contamination)
+    st.session_state.mp_detector = MatrixProfileDetector()
     st.session_state.deep_detector = DeepAnomalyDetector()
+    st.session_state.pca_detector = PCAReconstructionDetector()
     st.session_state.drift_detector = ModelDriftDetector(drift_threshold=drift_threshold)
     st.session_state.regime_detector = MarketRegimeDetector()
     st.session_state.alert_manager = AnomalyAlertManager()
@@ -2019,8 +5241,9 @@ def update_active_dataset(df, timestamp_col, value_col, dataset_label, anomaly_c
     z_threshold = config.get('z_threshold', 3.0)
     contamination = config.get('contamination', 0.1)
     drift_threshold = config.get('drift_threshold', 0.1)
+    svm_backend = config.get('svm_backend', 'exact')
 
-    reset_detectors(z_threshold, contamination, drift_threshold)
+    reset_detectors(z_threshold, contamination, drift_threshold, svm_backend)
     st.session_state.last_update = datetime.now()
 
     run_full_analysis()
@@ -2332,16 +5555,30 @@ def main():
         st.session_state.multivariate_data = generate_multivariate_data()
     if 'stat_detector' not in st.session_state:
         st.session_state.stat_detector = StatisticalAnomalyDetector()
+    if 'cusum_detector' not in st.session_state:
+        st.session_state.cusum_detector = CUSUMDetector()
+    if 'ph_detector' not in st.session_state:
+        st.session_state.ph_detector = PageHinkleyDetector()
     if 'ml_detector' not in st.session_state:
         st.session_state.ml_detector = MLAnomalyDetector()
+    if 'hst_detector' not in st.session_state:
+        st.session_state.hst_detector = HalfSpaceTrees()
+    if 'score_calibrator' not in st.session_state:
+        st.session_state.score_calibrator = ScoreCalibrator()
+    if 'mp_detector' not in st.session_state:
+        st.session_state.mp_detector = MatrixProfileDetector()
     if 'deep_detector' not in st.session_state:
         st.session_state.deep_detector = DeepAnomalyDetector()
+    if 'pca_detector' not in st.session_state:
+        st.session_state.pca_detector = PCAReconstructionDetector()
     if 'drift_detector' not in st.session_state:
         st.session_state.drift_detector = ModelDriftDetector()
     if 'regime_detector' not in st.session_state:
         st.session_state.regime_detector = MarketRegimeDetector()
     if 'alert_manager' not in st.session_state:
         st.session_state.alert_manager = AnomalyAlertManager()
+    if 'model_cache' not in st.session_state:
+        st.session_state.model_cache = ModelCache(disk_dir=MODEL_CACHE_DIR)
     if 'last_update' not in st.session_state:
         st.session_state.last_update = datetime.now()
     if 'active_dataset_label' not in st.session_state:
@@ -2352,7 +5589,8 @@ def main():
             'anomaly_rate': 0.05,
             'z_threshold': 3.0,
             'contamination': 0.1,
-            'drift_threshold': 0.1
+            'drift_threshold': 0.1,
+            'svm_backend': 'exact'
         }
     
     # Enhanced Sidebar with Tabbed Layout
@@ -2631,6 +5869,21 @@ def main():
                     st.session_state.current_config['drift_threshold'] = min(0.3, round(current_dr + 0.01, 2))
                     st.rerun()
             
+            st.markdown("<div style='height: 0.5rem;'></div>", unsafe_allow_html=True)
+            
+            # One-Class SVM backend (exact RBF or linear-time approximation)
+            svm_options = ['exact', 'approx']
+            svm_choice = st.selectbox(
+                "One-Class SVM Backend",
+                svm_options,
+                index=svm_options.index(st.session_state.current_config.get('svm_backend', 'exact')),
+                format_func=lambda b: "Exact RBF kernel" if b == 'exact' else "Kernel approximation (large data)",
+                key="svm_backend_select"
+            )
+            if svm_choice != st.session_state.current_config.get('svm_backend', 'exact'):
+                st.session_state.current_config['svm_backend'] = svm_choice
+                st.rerun()
+            
             # Set variables for detector sync
             data_points = st.session_state.current_config.get('data_points', 500)
             anomaly_rate = st.session_state.current_config.get('anomaly_rate', 0.05)
@@ -2672,7 +5925,16 @@ def main():
                 )
                 st.session_state.multivariate_data = generate_multivariate_data(n_points=data_points)
                 st.session_state.stat_detector = StatisticalAnomalyDetector(z_threshold=z_threshold)
-                st.session_state.ml_detector = MLAnomalyDetector(contamination=contamination)
+                st.session_state.cusum_detector = CUSUMDetector()
+                st.session_state.ph_detector = PageHinkleyDetector()
+                st.session_state.ml_detector = MLAnomalyDetector(
+                    contamination=contamination,
+                    svm_backend=st.session_state.current_config.get('svm_backend', 'exact')
+                )
+                st.session_state.hst_detector = HalfSpaceTrees(contamination=contamination)
+                st.session_state.score_calibrator = ScoreCalibrator(contamination=contamination)
+                st.session_state.mp_detector = MatrixProfileDetector()
+                st.session_state.pca_detector = PCAReconstructionDetector()
                 st.session_state.drift_detector = ModelDriftDetector(drift_threshold=drift_threshold)
                 st.session_state.active_dataset_label = 'Synthetic Stream'
                 st.session_state.last_update = datetime.now()
@@ -2684,6 +5946,24 @@ def main():
                 st.session_state.last_update = datetime.now()
                 st.success("✓ Analysis complete!")
             
+            if st.button("💾 Save Checkpoint", use_container_width=True, key="sidebar_checkpoint_save"):
+                try:
+                    save_checkpoint(CHECKPOINT_DIR, {
+                        key: st.session_state[key] for key in CHECKPOINT_SESSION_KEYS
+                    })
+                    st.success(f"✓ Checkpoint saved to {CHECKPOINT_DIR}")
+                except Exception as exc:
+                    st.error(f"Checkpoint save failed: {exc}")
+            
+            if st.button("♻️ Restore Checkpoint", use_container_width=True, key="sidebar_checkpoint_load"):
+                if os.path.isdir(CHECKPOINT_DIR):
+                    for key, detector in load_checkpoint(CHECKPOINT_DIR).items():
+                        st.session_state[key] = detector
+                    st.session_state.last_update = datetime.now()
+                    st.success("✓ Detectors restored")
+                else:
+                    st.warning(f"No checkpoint found in {CHECKPOINT_DIR}")
+            
             st.markdown("<div style='height: 1rem;'></div>", unsafe_allow_html=True)
             
             # Current Configuration Display
@@ -2879,7 +6159,14 @@ def main():
 
     # Sync detector thresholds with sidebar selections
     st.session_state.stat_detector.z_threshold = z_threshold
-    st.session_state.ml_detector.contamination = contamination
+    if st.session_state.ml_detector.contamination != contamination:
+        st.session_state.ml_detector.set_contamination(contamination)
+    st.session_state.hst_detector.contamination = contamination
+    st.session_state.score_calibrator.contamination = contamination
+    svm_backend = st.session_state.current_config.get('svm_backend', 'exact')
+    if st.session_state.ml_detector.svm_backend != svm_backend:
+        st.session_state.ml_detector = MLAnomalyDetector(contamination=contamination, svm_backend=svm_backend)
+        st.session_state.score_calibrator = ScoreCalibrator(contamination=contamination)
     st.session_state.drift_detector.drift_threshold = drift_threshold
     
     # Main content
@@ -2916,16 +6203,57 @@ def run_full_analysis():
     data = st.session_state.data
     values = data['value'].values
     
+    cache = st.session_state.model_cache
+    
     # Fit ML models
-    st.session_state.ml_detector.fit(values)
-    st.session_state.deep_detector.fit(values)
+    cache.fit(st.session_state.ml_detector, 'fit', values)
+    cache.fit(st.session_state.deep_detector, 'fit', values)
+    cache.fit(st.session_state.pca_detector, 'fit', values)
+    st.session_state.score_calibrator.fitted = False  # rebuilt from the refitted scores
     
     # Set drift reference
-    st.session_state.drift_detector.set_reference(values[:len(values)//2])
+    cache.fit(st.session_state.drift_detector, 'set_reference', values[:len(values)//2],
+              state_kwargs={'history': False})
     
     # Fit regime detector
     mv_data = st.session_state.multivariate_data
-    st.session_state.regime_detector.fit(mv_data['price'].values)
+    cache.fit(st.session_state.regime_detector, 'fit', mv_data['price'].values)
+
+
+# The matrix profile is O(n^2): longer series are profiled over block means
+MATRIX_PROFILE_MAX_POINTS = 10_000
+
+
+def cached_matrix_profile(values, compute=True, max_points=MATRIX_PROFILE_MAX_POINTS):
+    """Matrix-profile (anomalies, scores, factor) for the anomaly tab
+
+    Results are kept in session state under a fingerprint of the data and
+    the detector's parameters, so reruns reuse them; with compute=False a
+    missing result gives None instead of running the profile. Series longer
+    than max_points are profiled over means of factor-point blocks and the
+    results repeated back to full length.
+    """
+    detector = st.session_state.mp_detector
+    key = data_fingerprint(values, window_size=detector.window_size, top_k=detector.top_k,
+                           exclusion=detector.exclusion, max_points=max_points)
+    cached = st.session_state.get('mp_result')
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    if not compute:
+        return None
+
+    series = np.asarray(values, dtype=np.float64)
+    n = len(series)
+    factor = int(np.ceil(n / max_points)) if n > max_points else 1
+    if factor > 1:
+        starts = np.arange(0, n, factor)
+        series = np.add.reduceat(series, starts) / np.diff(np.append(starts, n))
+    anomalies, scores = detector.detect(series)
+    if factor > 1:
+        anomalies = np.repeat(anomalies, factor)[:n]
+        scores = np.repeat(scores, factor)[:n]
+    st.session_state.mp_result = (key, (anomalies, scores, factor))
+    return anomalies, scores, factor
 
 
 def render_anomaly_detection_tab():
@@ -2939,28 +6267,46 @@ def render_anomaly_detection_tab():
     col1, col2, col3, col4 = st.columns(4)
     
     # Statistical detection
-    stat_scores = []
-    stat_anomalies = []
-    for val in values:
-        is_anomaly, score, _ = st.session_state.stat_detector.detect(val)
-        stat_scores.append(score)
-        stat_anomalies.append(1 if is_anomaly else 0)
-    stat_scores = np.array(stat_scores)
-    stat_anomalies = np.array(stat_anomalies)
+    stat_anomalies, stat_scores, _ = st.session_state.stat_detector.detect_batch(values)
+    stat_anomalies = stat_anomalies.astype(int)
+    
+    # Change-point detection (level shifts)
+    cusum_anomalies, cusum_scores, _ = st.session_state.cusum_detector.detect_batch(values)
+    ph_anomalies, ph_scores, _ = st.session_state.ph_detector.detect_batch(values)
+    change_anomalies = (cusum_anomalies | ph_anomalies).astype(int)
+    change_scores = np.maximum(cusum_scores, ph_scores)
     
     # ML detection
     if st.session_state.ml_detector.fitted:
         ml_anomalies, ml_scores = st.session_state.ml_detector.detect(values)
     else:
-        st.session_state.ml_detector.fit(values)
+        st.session_state.model_cache.fit(st.session_state.ml_detector, 'fit', values)
         ml_anomalies, ml_scores = st.session_state.ml_detector.detect(values)
+    if getattr(st.session_state.ml_detector, 'fit_warning', None):
+        st.warning(st.session_state.ml_detector.fit_warning)
+    
+    # Online tree ensemble (keeps learning as values stream in)
+    hst_anomalies, hst_scores = st.session_state.hst_detector.detect(values)
     
     # Deep detection
+    if not st.session_state.deep_detector.fitted:
+        st.session_state.model_cache.fit(st.session_state.deep_detector, 'fit', values)
     deep_anomalies, deep_scores = st.session_state.deep_detector.detect(values)
     
-    # Ensemble
-    ensemble_scores = 0.35 * stat_scores + 0.35 * ml_scores + 0.3 * deep_scores
-    ensemble_anomalies = (ensemble_scores > 0.5).astype(int)
+    # Low-rank PCA reconstruction (lighter, deterministic counterpart to the autoencoder)
+    if not st.session_state.pca_detector.fitted:
+        st.session_state.model_cache.fit(st.session_state.pca_detector, 'fit', values)
+    pca_anomalies, pca_scores = st.session_state.pca_detector.detect(values)
+    
+    # Ensemble: fuse calibrated percentiles instead of raw scores on unrelated scales
+    # Raw ML scores do not depend on the contamination thresholds, so the
+    # calibration tables stay valid when the slider moves
+    fusion_scores = dict(st.session_state.ml_detector.raw_scores(values),
+                         statistical=stat_scores, deep=deep_scores, change_point=change_scores)
+    calibrator = st.session_state.score_calibrator
+    if not calibrator.fitted:
+        calibrator.fit(fusion_scores)
+    ensemble_anomalies, ensemble_scores = calibrator.detect(fusion_scores)
     
     # Summary Banner
     total_ensemble = int(np.sum(ensemble_anomalies))
@@ -3029,7 +6375,7 @@ def render_anomaly_detection_tab():
     with mc3:
         st.markdown(f'<div style="{card_bg}"><div style="{label_s}">Deep Learning Anomalies</div><div style="{value_s} color: {get_color(deep_count)};">{deep_count}</div><div style="{meta_s}">Autoencoder Reconstruction</div></div>', unsafe_allow_html=True)
     with mc4:
-        st.markdown(f'<div style="{card_bg}"><div style="{label_s}">Ensemble Anomalies</div><div style="{value_s} color: {get_color(ensemble_count)};">{ensemble_count}</div><div style="{meta_s}">Weighted Combination</div></div>', unsafe_allow_html=True)
+        st.markdown(f'<div style="{card_bg}"><div style="{label_s}">Ensemble Anomalies</div><div style="{value_s} color: {get_color(ensemble_count)};">{ensemble_count}</div><div style="{meta_s}">Calibrated Rank Fusion</div></div>', unsafe_allow_html=True)
     
     # Health indicators using st.columns
     detection_rate = ensemble_count / len(values) * 100 if len(values) > 0 else 0
@@ -3092,15 +6438,28 @@ def render_anomaly_detection_tab():
     # Main visualization
     method = st.selectbox(
         "Select Detection Method",
-        ["Ensemble", "Statistical", "Machine Learning", "Deep Learning"]
+        ["Ensemble", "Statistical", "Change Point", "Machine Learning", "Streaming Forest", "Matrix Profile",
+         "Deep Learning", "PCA Reconstruction"]
     )
     
     if method == "Ensemble":
         scores, anomalies = ensemble_scores, ensemble_anomalies
     elif method == "Statistical":
         scores, anomalies = stat_scores, stat_anomalies
+    elif method == "Change Point":
+        scores, anomalies = change_scores, change_anomalies
     elif method == "Machine Learning":
         scores, anomalies = ml_scores, ml_anomalies
+    elif method == "Streaming Forest":
+        scores, anomalies = hst_scores, hst_anomalies
+    elif method == "Matrix Profile":
+        # Matrix-profile discords (unusual subsequences), only computed when selected
+        anomalies, scores, mp_factor = cached_matrix_profile(values)
+        if mp_factor > 1:
+            st.caption(f"Matrix profile taken over {mp_factor}-point block means "
+                       f"({len(values):,} points exceed {MATRIX_PROFILE_MAX_POINTS:,})")
+    elif method == "PCA Reconstruction":
+        scores, anomalies = pca_scores, pca_anomalies
     else:
         scores, anomalies = deep_scores, deep_anomalies
     
@@ -3112,10 +6471,19 @@ def render_anomaly_detection_tab():
     
     methods_summary = {
         'Statistical': {'detected': np.sum(stat_anomalies), 'score': np.mean(stat_scores)},
+        'Change Point': {'detected': np.sum(change_anomalies), 'score': np.mean(change_scores)},
         'ML Ensemble': {'detected': np.sum(ml_anomalies), 'score': np.mean(ml_scores)},
+        'Streaming Forest': {'detected': np.sum(hst_anomalies), 'score': np.mean(hst_scores)},
+    }
+    # Listed once it has been computed for this data
+    mp_result = cached_matrix_profile(values, compute=False)
+    if mp_result is not None:
+        methods_summary['Matrix Profile'] = {'detected': np.sum(mp_result[0]), 'score': np.mean(mp_result[1])}
+    methods_summary.update({
         'Deep Learning': {'detected': np.sum(deep_anomalies), 'score': np.mean(deep_scores)},
+        'PCA Reconstruction': {'detected': np.sum(pca_anomalies), 'score': np.mean(pca_scores)},
         'Combined': {'detected': np.sum(ensemble_anomalies), 'score': np.mean(ensemble_scores)}
-    }
+    })
     
     max_score = float(np.max(ensemble_scores))
     
@@ -3172,7 +6540,8 @@ def render_anomaly_detection_tab():
             st.json({
                 "Isolation Forest": int(np.sum(ml_anomalies)),
                 "Ensemble Score": float(np.mean(ml_scores)),
-                "Detection Rate": f"{100 * np.sum(ml_anomalies) / len(values):.2f}%"
+                "Detection Rate": f"{100 * np.sum(ml_anomalies) / len(values):.2f}%",
+                "Fit Times (s)": {name: round(t, 3) for name, t in st.session_state.ml_detector.fit_times.items()}
             })
 
     # Highest Impact Signals with per-card rendering
@@ -3249,7 +6618,8 @@ def render_drift_detection_tab():
     
     # Set reference if not set
     if st.session_state.drift_detector.reference_data is None:
-        st.session_state.drift_detector.set_reference(values[:len(values)//2])
+        st.session_state.model_cache.fit(st.session_state.drift_detector, 'set_reference',
+                                         values[:len(values)//2], state_kwargs={'history': False})
     
     # Detect drift on recent data
     drift_detected, drift_score, details = st.session_state.drift_detector.detect_drift(values)
@@ -3281,10 +6651,19 @@ def render_drift_detection_tab():
     
     st.markdown("<br>", unsafe_allow_html=True)
     
-    # Drift history chart
-    fig = create_drift_chart(st.session_state.drift_detector.drift_history)
+    # Drift over time: every sliding detection window of the series in one pass
+    n_windows = max(1, len(values) - st.session_state.drift_detector.detection_window + 1)
+    timeline = st.session_state.drift_detector.drift_timeline(values, step=max(1, n_windows // 2000))
+    timeline['timestamp'] = data['timestamp'].values[timeline['end'].astype(int)]
+    fig = create_drift_chart(timeline)
     st.plotly_chart(fig, use_container_width=True)
     
+    # Session history of drift checks (hourly and minute rollups, then raw checks)
+    history = st.session_state.drift_detector.drift_history.timeline()
+    if len(history['score']) > 1:
+        fig_history = create_drift_chart(history, title="Drift Checks This Session")
+        st.plotly_chart(fig_history, use_container_width=True)
+    
     # Distribution comparison
     st.markdown('<h3 class="section-title">📊 Distribution Comparison</h3>', unsafe_allow_html=True)
     
@@ -3351,7 +6730,7 @@ def render_regime_analysis_tab():
     
     # Fit regime detector if not fitted
     if not st.session_state.regime_detector.fitted:
-        st.session_state.regime_detector.fit(mv_data['price'].values)
+        st.session_state.model_cache.fit(st.session_state.regime_detector, 'fit', mv_data['price'].values)
     
     # Detect current regime
     regime_info = st.session_state.regime_detector.detect_regime(mv_data['price'].values)
@@ -3446,18 +6825,18 @@ def render_alerts_tab():
     values = data['value'].values
     
     # Check for anomalies and add alerts
-    for i in range(-5, 0):
-        val = values[i]
-        is_anomaly, score, details = st.session_state.stat_detector.detect(val)
-        
-        if is_anomaly:
-            severity = 'critical' if score > 0.8 else 'warning'
-            alert_manager.add_alert(
-                alert_type='statistical_anomaly',
-                severity=severity,
-                message=f"Statistical anomaly detected: value={val:.2f}, score={score:.3f}",
-                details=details
-            )
+    recent_values = values[-5:]
+    recent_flags, recent_scores, recent_details = st.session_state.stat_detector.detect_batch(recent_values)
+    for i in np.flatnonzero(recent_flags):
+        val = recent_values[i]
+        score = recent_scores[i]
+        severity = 'critical' if score > 0.8 else 'warning'
+        alert_manager.add_alert(
+            alert_type='statistical_anomaly',
+            severity=severity,
+            message=f"Statistical anomaly detected: value={val:.2f}, score={score:.3f}",
+            details={key: detail[i] for key, detail in recent_details.items()}
+        )
     
     # Check drift
     drift_detected, drift_score, drift_details = st.session_state.drift_detector.detect_drift(values)
@@ -3539,14 +6918,10 @@ def render_reports_tab():
         st.markdown("### 📊 Executive Summary")
         
         # Anomaly summary
-        stat_scores = []
-        stat_anomalies = []
-        for val in values:
-            is_anomaly, score, _ = st.session_state.stat_detector.detect(val)
-            stat_scores.append(score)
-            stat_anomalies.append(1 if is_anomaly else 0)
+        stat_anomalies, stat_scores, _ = st.session_state.stat_detector.detect_batch(values)
+        stat_anomalies = stat_anomalies.astype(int)
         
-        total_anomalies = sum(stat_anomalies)
+        total_anomalies = int(np.sum(stat_anomalies))
         anomaly_rate = total_anomalies / len(values)
         
         # Drift summary